@@ -0,0 +1,198 @@
+# Computerized adaptive testing (CAT) for the IQ bank using a 2PL IRT model.
+# Item response probabilities and Fisher information are precomputed once per
+# bank over a fixed ability grid, together with each grid point's items ranked
+# by information. Picking the next item is then a walk down one precomputed
+# ranking (skipping items already served) instead of a scan over the bank, and
+# the ability posterior is updated with one precomputed column per answer.
+#
+# Scores are reported on the standard test's scale: the ability estimate is
+# converted to the percentage of the whole bank it is expected to answer
+# correctly, then to an IQ estimate with the same formula as score_iq().
+
+import numpy as np
+
+from question_bank import iq_bank
+from scoring import STRONG_AREA_SHARE, WEAK_AREA_SHARE
+
+# Default b (difficulty) per label when an item has no calibrated irt_b
+DIFFICULTY_B = {"Easy": -1.0, "Medium": 0.0, "Hard": 1.0}
+
+THETA_GRID = np.linspace(-4.0, 4.0, 81)
+
+
+class ItemPool:
+    """Precomputed 2PL tables for one question bank."""
+
+    def __init__(self, a, b, grid=THETA_GRID):
+        self.a = np.asarray(a, dtype=np.float64)
+        self.b = np.asarray(b, dtype=np.float64)
+        self.grid = np.asarray(grid, dtype=np.float64)
+
+        # (grid points, items) probability of a correct answer
+        p = 1.0 / (1.0 + np.exp(-self.a * (self.grid[:, None] - self.b)))
+        p = np.clip(p, 1e-9, 1 - 1e-9)
+        self.log_p = np.log(p)
+        self.log_q = np.log1p(-p)
+        information = self.a ** 2 * p * (1 - p)
+
+        # Items ordered by information, most informative first, per grid point
+        self.ranking = np.argsort(-information, axis=1, kind="stable").astype(np.int32)
+        # Standard normal prior over the grid
+        self.log_prior = -0.5 * self.grid ** 2
+        # Expected percentage correct over the whole bank per grid point
+        self.expected_percentage = np.exp(self.log_p).mean(axis=1) * 100
+
+    @classmethod
+    def from_bank(cls, bank):
+        a = [q.irt_a for q in bank]
+        b = [q.irt_b if q.irt_b is not None else DIFFICULTY_B.get(q.difficulty, 0.0)
+             for q in bank]
+        return cls(a, b)
+
+    def __len__(self):
+        return len(self.a)
+
+    def next_item(self, theta, administered):
+        """Most informative unserved item at the grid point nearest theta."""
+        row = self.ranking[int(np.abs(self.grid - theta).argmin())]
+        for item in row:
+            if item not in administered:
+                return int(item)
+        return None
+
+    def update(self, log_posterior, item, correct):
+        return log_posterior + (self.log_p[:, item] if correct else self.log_q[:, item])
+
+    def estimate(self, log_posterior):
+        """EAP ability estimate and its posterior standard deviation."""
+        weights = np.exp(log_posterior - log_posterior.max())
+        weights /= weights.sum()
+        theta = float(weights @ self.grid)
+        se = float(np.sqrt(weights @ (self.grid - theta) ** 2))
+        return theta, se
+
+    def expected_se(self, log_posterior, item):
+        """Posterior standard deviation expected after answering item."""
+        weights = np.exp(log_posterior - log_posterior.max())
+        p_correct = float(weights @ np.exp(self.log_p[:, item]) / weights.sum())
+        _, se_correct = self.estimate(self.update(log_posterior, item, True))
+        _, se_wrong = self.estimate(self.update(log_posterior, item, False))
+        return p_correct * se_correct + (1 - p_correct) * se_wrong
+
+    def percentage(self, theta):
+        """Percentage of the bank a respondent at theta is expected to answer correctly."""
+        return float(np.interp(theta, self.grid, self.expected_percentage))
+
+
+class AdaptiveTest:
+    """One respondent's adaptive session over an ItemPool.
+
+    Stops after max_items, or after min_items once the standard error is at
+    most se_target or the next item would lower it by less than min_gain
+    (a small or uncalibrated bank levels off well above se_target).
+    """
+
+    def __init__(self, pool, min_items=5, max_items=20, se_target=0.3, min_gain=0.02):
+        self.pool = pool
+        self.min_items = min_items
+        self.max_items = min(max_items, len(pool))
+        self.se_target = se_target
+        self.min_gain = min_gain
+        self.administered = []
+        self.responses = []
+        self.log_posterior = pool.log_prior.copy()
+        self.theta, self.se = pool.estimate(self.log_posterior)
+        self._served = set()
+
+    @property
+    def finished(self):
+        served = len(self.administered)
+        if served >= self.max_items:
+            return True
+        if served < self.min_items:
+            return False
+        if self.se <= self.se_target:
+            return True
+        item = self.pool.next_item(self.theta, self._served)
+        return item is None or self.se - self.pool.expected_se(self.log_posterior, item) < self.min_gain
+
+    def next_item(self):
+        if self.finished:
+            return None
+        return self.pool.next_item(self.theta, self._served)
+
+    @property
+    def iq_margin(self):
+        """Half-width of the theta +/- se interval on the IQ scale."""
+        return (iq_from_theta(self.pool, self.theta + self.se) - iq_from_theta(self.pool, self.theta - self.se)) / 2
+
+    def answer(self, item, correct):
+        self.administered.append(item)
+        self.responses.append(bool(correct))
+        self._served.add(item)
+        self.log_posterior = self.pool.update(self.log_posterior, item, correct)
+        self.theta, self.se = self.pool.estimate(self.log_posterior)
+
+    # Saved (e.g. when an idle session is spilled) as settings and responses
+    # only; the shared pool and posterior are rebuilt from the current bank
+    def to_dict(self):
+        return {
+            'min_items': self.min_items, 'max_items': self.max_items,
+            'se_target': self.se_target, 'min_gain': self.min_gain,
+            'administered': list(self.administered), 'responses': list(self.responses),
+        }
+
+    @classmethod
+    def from_dict(cls, doc):
+        test = cls(pool_for(iq_bank()), int(doc['min_items']), int(doc['max_items']),
+                   float(doc['se_target']), float(doc['min_gain']))
+        administered = [int(item) for item in doc['administered']]
+        # Answers to a bank that has since changed are dropped
+        if all(0 <= item < len(test.pool) for item in administered):
+            for item, correct in zip(administered, doc['responses']):
+                test.answer(item, bool(correct))
+        return test
+
+
+# Pools are built once per loaded bank and shared by every session
+_pools = {}
+
+
+def pool_for(bank):
+    """The ItemPool for a QuestionBank, rebuilt only when the bank is reloaded."""
+    cached = _pools.get(id(bank))
+    if cached is None or cached[0] is not bank:
+        if len(_pools) >= 4:
+            _pools.clear()
+        cached = _pools[id(bank)] = (bank, ItemPool.from_bank(bank))
+    return cached[1]
+
+
+def iq_from_theta(pool, theta):
+    # Same formula as score_iq(), so both modes share the 85-115 scale
+    return 85 + pool.percentage(theta) * 0.3
+
+
+def score_adaptive(test, bank):
+    """Summarize a finished adaptive test in the same shape as score_iq()."""
+    category_scores = {}
+    for item, correct in zip(test.administered, test.responses):
+        category = bank[item].category
+        scores = category_scores.setdefault(category, {'correct': 0, 'total': 0})
+        scores['total'] += 1
+        scores['correct'] += int(correct)
+
+    served = len(test.administered)
+    correct_count = sum(test.responses)
+    return {
+        'correct_count': correct_count,
+        'total': served,
+        'score_percentage': correct_count / served * 100 if served else 0.0,
+        'iq_estimate': iq_from_theta(test.pool, test.theta),
+        'theta': test.theta,
+        'standard_error': test.se,
+        'category_scores': category_scores,
+        'weak_areas': [cat for cat, s in category_scores.items() if s['correct'] / s['total'] < WEAK_AREA_SHARE],
+        'strong_areas': [cat for cat, s in category_scores.items() if s['correct'] / s['total'] >= STRONG_AREA_SHARE],
+        'item_results': [[bank[item].id, int(correct)] for item, correct in zip(test.administered, test.responses)],
+    }
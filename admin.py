@@ -0,0 +1,122 @@
+# Cohort analytics dashboard for administrators.
+# A separate Streamlit app over the rollup tables (see rollups.py), so it is
+# not reachable from the public app. Serve it on an internal port:
+#
+#   streamlit run admin.py --server.port 8502
+
+import datetime
+import time
+
+import streamlit as st
+
+from question_bank import iq_bank
+from rollups import AGE_BANDS, UNKNOWN_AGE, CohortStats
+from storage import DEFAULT_DB_PATH
+
+st.set_page_config(page_title="Assessment Analytics", page_icon="📊", layout="wide")
+st.title("📊 Cohort Analytics")
+
+
+@st.cache_resource
+def get_stats():
+    return CohortStats(DEFAULT_DB_PATH)
+
+
+stats = get_stats()
+
+# Filters
+today = datetime.date.today()
+col1, col2 = st.columns([1, 2])
+with col1:
+    dates = st.date_input("Date range:", (today - datetime.timedelta(days=90), today))
+with col2:
+    bands = st.multiselect("Age bands:", AGE_BANDS + (UNKNOWN_AGE,), help="Leave empty for all ages")
+
+start, end = (dates[0], dates[-1]) if dates else (None, None)
+filters = dict(start=start, end=end, age_bands=bands)
+
+started = time.perf_counter()
+daily = stats.daily_submissions(**filters)
+bmi_categories = stats.outcomes('bmi', 'category', **filters)
+stress_levels = stats.outcomes('stress', 'level', **filters)
+stress_risks = stats.outcomes('stress', 'risk', **filters)
+iq_bands = stats.outcomes('iq', 'score band', **filters)
+iq_categories = stats.iq_categories(**filters)
+iq_questions = stats.iq_questions(**filters)
+elapsed_ms = (time.perf_counter() - started) * 1000
+
+totals = {}
+for _, test_type, count in daily:
+    totals[test_type] = totals.get(test_type, 0) + count
+
+metric_cols = st.columns(4)
+metric_cols[0].metric("Submissions", sum(totals.values()))
+metric_cols[1].metric("IQ Tests", totals.get('iq', 0))
+metric_cols[2].metric("BMI Checks", totals.get('bmi', 0))
+metric_cols[3].metric("Stress Assessments", totals.get('stress', 0))
+st.caption(f"Answered from rollups in {elapsed_ms:.1f} ms")
+
+if not daily:
+    st.info("No submissions match these filters.")
+    st.stop()
+
+# Submissions per day, one line per test type
+st.markdown("### 📅 Submissions per Day")
+days = sorted({day for day, _, _ in daily})
+by_day = {(day, test_type): count for day, test_type, count in daily}
+test_types = sorted(totals)
+st.line_chart(
+    {'day': days, **{test_type: [by_day.get((day, test_type), 0) for day in days] for test_type in test_types}},
+    x='day', y=test_types,
+)
+
+
+def distribution(title, rows, column):
+    st.markdown(f"#### {title}")
+    if rows:
+        st.bar_chart({column: [bucket for bucket, _ in rows], 'count': [count for _, count in rows]},
+                     x=column, y='count', height=250)
+    else:
+        st.caption("No data")
+
+
+st.markdown("### ⚖️ BMI and 😰 Stress")
+col1, col2, col3 = st.columns(3)
+with col1:
+    distribution("BMI category", bmi_categories, 'category')
+with col2:
+    distribution("Stress level", stress_levels, 'level')
+with col3:
+    distribution("Stress risk", stress_risks, 'risk')
+
+st.markdown("### 🧮 IQ")
+col1, col2 = st.columns(2)
+with col1:
+    distribution("Estimated IQ band", iq_bands, 'band')
+with col2:
+    st.markdown("#### Accuracy by category")
+    if iq_categories:
+        st.bar_chart(
+            {'category': [category for category, _, _ in iq_categories],
+             'accuracy %': [correct / total * 100 if total else 0.0 for _, correct, total in iq_categories]},
+            x='category', y='accuracy %', height=250,
+        )
+    else:
+        st.caption("No data")
+
+st.markdown("#### Per-question correctness")
+bank = {question.id: question for question in iq_bank()}
+rows = sorted(
+    ((question, correct / answered * 100, answered) for question, correct, answered in iq_questions if answered),
+    key=lambda row: row[1],
+)
+st.dataframe(
+    {
+        'question': [bank[q].question if q in bank else f"{q} (no longer in bank)" for q, _, _ in rows],
+        'category': [bank[q].category if q in bank else "" for q, _, _ in rows],
+        'correct %': [round(rate, 1) for _, rate, _ in rows],
+        'answered': [answered for _, _, answered in rows],
+    },
+    hide_index=True,
+    width='stretch',
+)
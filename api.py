@@ -0,0 +1,121 @@
+# Headless JSON scoring API (ASGI), running alongside the Streamlit UI.
+# Scores come from the same scoring engine the app uses.
+#
+# Run with:  uvicorn api:app --host 0.0.0.0 --port 8000
+#
+#   GET  /health
+#   POST /score/iq      {"answers": ["32", "Some roses might be red", ...]}
+#   POST /score/bmi     {"height": 170, "weight": 70, "age": 30,
+#                        "activity_level": "...", "health_goal": "..."}
+#   POST /score/stress  {"answers": [0, 3, "Often (3)", ...]}
+#   POST /score/bulk    {"submissions": [{"type": "bmi", ...}, ...]}
+
+import asyncio
+import json
+
+from submissions import SubmissionError, TEST_TYPES, score_submission
+
+MAX_BODY_BYTES = 16 * 1024 * 1024
+MAX_BULK_SUBMISSIONS = 10000
+# Bulk requests at least this large are scored off the event loop
+BULK_THREAD_THRESHOLD = 200
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+async def _read_json(receive):
+    body = bytearray()
+    while True:
+        message = await receive()
+        body.extend(message.get('body', b''))
+        if len(body) > MAX_BODY_BYTES:
+            raise HTTPError(413, "Request body too large")
+        if not message.get('more_body'):
+            break
+    try:
+        return json.loads(body or b'null')
+    except ValueError:
+        raise HTTPError(400, "Request body must be valid JSON") from None
+
+
+async def _send_json(send, status, payload):
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', b'application/json; charset=utf-8'),
+            (b'content-length', str(len(body)).encode()),
+        ],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+def _score_bulk(submissions):
+    results = []
+    for submission in submissions:
+        try:
+            if not isinstance(submission, dict):
+                raise SubmissionError("Submission must be a JSON object")
+            results.append({'ok': True, 'result': score_submission(submission.get('type'), submission)})
+        except SubmissionError as exc:
+            results.append({'ok': False, 'error': str(exc)})
+    return results
+
+
+async def _handle(method, path, receive):
+    if path == '/health':
+        return {'status': 'ok'}
+
+    if not path.startswith('/score/'):
+        raise HTTPError(404, "Not found")
+    if method != 'POST':
+        raise HTTPError(405, "Use POST")
+
+    test_type = path[len('/score/'):]
+    payload = await _read_json(receive)
+
+    if test_type == 'bulk':
+        submissions = payload.get('submissions') if isinstance(payload, dict) else None
+        if not isinstance(submissions, list):
+            raise HTTPError(400, "'submissions' must be a list")
+        if len(submissions) > MAX_BULK_SUBMISSIONS:
+            raise HTTPError(413, f"At most {MAX_BULK_SUBMISSIONS} submissions per request")
+        if len(submissions) >= BULK_THREAD_THRESHOLD:
+            results = await asyncio.to_thread(_score_bulk, submissions)
+        else:
+            results = _score_bulk(submissions)
+        return {'results': results}
+
+    if test_type not in TEST_TYPES:
+        raise HTTPError(404, f"Unknown test type {test_type!r}")
+    try:
+        return score_submission(test_type, payload)
+    except SubmissionError as exc:
+        raise HTTPError(400, str(exc)) from None
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    if scope['type'] != 'http':
+        return
+
+    try:
+        payload = await _handle(scope['method'], scope['path'].rstrip('/') or '/', receive)
+    except HTTPError as exc:
+        await _send_json(send, exc.status, {'error': exc.message})
+    else:
+        await _send_json(send, 200, payload)
@@ -0,0 +1,89 @@
+# Assessment registry.
+# Each test is declared once here with its sidebar label, Home page card and
+# the module that provides its questions(), score() and render(). The sidebar,
+# progress counters and footer all iterate over ASSESSMENTS, and a test's
+# module is only imported when that test is selected.
+
+import importlib
+from dataclasses import dataclass
+
+from catalog import TestInfo
+
+HOME_LABEL = "🏠 Home"
+
+
+@dataclass(frozen=True, slots=True)
+class Assessment:
+    key: str          # test_history / storage key
+    label: str        # sidebar entry
+    name: str         # entry in completed_tests
+    module: str       # module exposing questions(), score() and render()
+    info: TestInfo    # Home page card
+    wizard: bool = False  # supports one-question-at-a-time mode
+    score_field: str = "score"  # result field kept in the session history
+    label_field: str = None     # optional result label kept alongside it
+    delta_color: str = "normal"  # st.metric delta colouring of the score trend
+
+    def load(self):
+        return importlib.import_module(self.module)
+
+
+ASSESSMENTS = (
+    Assessment(
+        key="iq",
+        label="🧮 IQ Test",
+        name="IQ Test",
+        module="assessments.iq",
+        info=TestInfo(
+            title="🧮 IQ Test",
+            description="Evaluate your cognitive abilities with 10 challenging questions",
+            features=("Logical reasoning", "Pattern recognition", "Problem solving", "Detailed explanations"),
+            time="⏱️ 10-15 minutes",
+            difficulty="🔴 Challenging",
+        ),
+        wizard=True,
+    ),
+    Assessment(
+        key="bmi",
+        label="⚖️ BMI & Nutrition",
+        name="BMI Test",
+        module="assessments.bmi",
+        info=TestInfo(
+            title="⚖️ BMI & Nutrition",
+            description="Calculate your BMI and receive personalized nutrition advice",
+            features=("BMI calculation", "Health assessment", "Food recommendations", "Lifestyle tips"),
+            time="⏱️ 5-8 minutes",
+            difficulty="🟢 Easy",
+        ),
+        score_field="bmi",
+        label_field="category",
+        delta_color="off",
+    ),
+    Assessment(
+        key="stress",
+        label="😰 Stress Assessment",
+        name="Stress Test",
+        module="assessments.stress",
+        info=TestInfo(
+            title="😰 Stress Assessment",
+            description="Measure your stress levels and get coping strategies",
+            features=("Stress evaluation", "Risk assessment", "Coping strategies", "Wellness tips"),
+            time="⏱️ 8-12 minutes",
+            difficulty="🟡 Moderate",
+        ),
+        wizard=True,
+        score_field="percentage",
+        label_field="level",
+        delta_color="inverse",
+    ),
+)
+
+BY_LABEL = {assessment.label: assessment for assessment in ASSESSMENTS}
+BY_KEY = {assessment.key: assessment for assessment in ASSESSMENTS}
+BY_NAME = {assessment.name: assessment for assessment in ASSESSMENTS}
+
+# Pre-rendered Home page cards
+CARDS_HTML = tuple(assessment.info.card_html for assessment in ASSESSMENTS)
+
+# Sidebar choices, in display order
+PAGE_LABELS = (HOME_LABEL,) + tuple(BY_LABEL)
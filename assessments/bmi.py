@@ -0,0 +1,124 @@
+# BMI calculator with a personalized nutrition plan
+
+import datetime
+
+import streamlit as st
+
+from bmi_preview import measurement_inputs
+from catalog import ACTIVITY_LEVELS, HEALTH_GOALS, DIETARY_OPTIONS
+from scoring import score_bmi
+from session import save_result, stream_results
+
+
+def questions():
+    return ()
+
+
+score = score_bmi
+
+# Results page layout: (heading, recommendation section, optional)
+RESULT_SECTIONS = (
+    ("🥗 Recommended Foods", 'foods', False),
+    ("🍽️ Daily Meal Plan Suggestions", 'meals', False),
+    ("🌱 Adapted for Your Dietary Preferences", 'diet', True),
+    ("💪 Lifestyle Recommendations", 'lifestyle', False),
+    ("🏃‍♀️ Exercise Recommendations", 'exercise', False),
+)
+
+
+def render(wizard_mode=False):
+    st.markdown("## ⚖️ BMI Calculator & Personalized Nutrition Plan")
+    
+    st.markdown("""
+    <div class="test-card">
+        <p>Calculate your Body Mass Index and receive personalized nutrition recommendations based on your health goals and current status.</p>
+        <p><strong>⏱️ Time needed:</strong> 5-8 minutes | <strong>📊 Includes:</strong> BMI calculation, health assessment, and meal planning</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Enhanced input section with better mobile layout. The inputs are one
+    # form, so nothing is sent to the server until the button is pressed;
+    # the BMI itself is previewed in the browser while typing.
+    col1, col2 = st.columns([1, 1])
+    
+    with col1:
+        with st.form("bmi_inputs", border=False):
+            st.markdown("### 📏 Your Measurements")
+            height, weight, age = measurement_inputs(st.session_state.user_profile['age'] or 25)
+            
+            # Additional factors for personalized recommendations
+            st.markdown("### 🎯 Personal Information")
+            activity_level = st.selectbox("Activity Level:", ACTIVITY_LEVELS)
+            
+            health_goal = st.selectbox("Primary Health Goal:", HEALTH_GOALS)
+            
+            dietary_restrictions = st.multiselect("Dietary Restrictions/Preferences:", DIETARY_OPTIONS)
+            
+            submitted = st.form_submit_button("🔍 Calculate My BMI & Get Recommendations", help="Get comprehensive health and nutrition analysis")
+    
+    with col2:
+        if submitted:
+            # The age entered here is the one cohort rollups band results by
+            st.session_state.user_profile['age'] = int(age)
+            # Scored and rendered on the shared results pool; the page fills in as parts finish
+            stream_results(
+                'bmi',
+                lambda: score_bmi(height, weight, age, activity_level, health_goal),
+                RESULT_SECTIONS,
+                lambda result: show_summary(result, health_goal, activity_level),
+                facts=lambda result: dict(result, dietary_restrictions=dietary_restrictions),
+            )
+
+
+def show_summary(result, health_goal, activity_level):
+    bmi = result['bmi']
+    category = result['category']
+    health_status = result['health_status']
+    
+    # Save results
+    save_result('bmi', {
+        'bmi': bmi,
+        'category': category,
+        'health_goal': health_goal,
+        'activity_level': activity_level,
+        'date': datetime.datetime.now()
+    })
+    
+    # Results display
+    st.markdown("""
+    <div class="result-card">
+        <h2>📊 Your Health Assessment Results</h2>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Metrics display
+    col_a, col_b, col_c = st.columns(3)
+    with col_a:
+        st.metric("BMI Score", f"{bmi:.1f}")
+    with col_b:
+        st.metric("Category", category)
+    with col_c:
+        if result['weight_goal'] is None:
+            st.metric("Status", "Ideal ✅")
+        else:
+            st.metric("Weight Goal", f"{result['weight_goal']:+.1f} kg")
+    
+    st.markdown(f"**Health Status:** {health_status}")
+    
+    # Personalized nutrition recommendations
+    st.markdown("### 🍽️ Personalized Nutrition Plan")
+    
+    target_calories = result['target_calories']
+    
+    st.markdown(f"""
+    <div class="improvement-card">
+        <h4>🎯 Your Daily Nutrition Targets</h4>
+        <ul>
+            <li><strong>Calories:</strong> {target_calories:.0f} kcal/day</li>
+            <li><strong>Protein:</strong> {result['protein_g']:.0f}g (25%)</li>
+            <li><strong>Carbs:</strong> {result['carbs_g']:.0f}g (45%)</li>
+            <li><strong>Fats:</strong> {result['fats_g']:.0f}g (30%)</li>
+            <li><strong>Water:</strong> {result['water_l']:.1f} liters/day</li>
+        </ul>
+    </div>
+    """, unsafe_allow_html=True)
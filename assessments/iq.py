@@ -0,0 +1,195 @@
+# IQ test: cognitive assessment with personalized recommendations
+
+import datetime
+
+import streamlit as st
+
+import metrics
+from catalog import breakdown_html
+from question_bank import iq_bank
+from recommendations import results_markdown
+from scoring import score_iq
+from session import render_wizard, save_result, session_run, sync_session
+from session_state import AnswerVector
+
+questions = iq_bank
+score = score_iq
+
+# Results page layout: (heading, recommendation section, optional)
+RESULT_SECTIONS = (
+    ("🎯 Personalized Improvement Recommendations", 'improvement', False),
+    ("💡 General Development Plan", 'general', False),
+)
+
+
+# Rendered as a fragment, so changing one answer only reruns this question
+@st.fragment
+def render_question(i, q, total):
+    with session_run(), st.container():
+        st.markdown(f"### Question {i+1}/{total}")
+        st.markdown(f"**Category:** {q.category} | **Difficulty:** {q.difficulty}")
+        st.markdown(f"**{q.question}**")
+        
+        # Restore the stored answer when the question is shown again
+        answer = st.radio(
+            "Select your answer:",
+            q.options,
+            index=st.session_state.iq_answers.get(i, 0),
+            key=f"iq_q{i+1}",
+            help=f"Category: {q.category} - {q.difficulty} level"
+        )
+        code = q.options.index(answer)
+        if st.session_state.iq_answers.get(i) != code:
+            st.session_state.iq_answers[i] = code
+            sync_session()
+        st.markdown("---")
+
+
+def render(wizard_mode=False):
+    bank = questions()
+    
+    st.markdown("## 🧮 Cognitive Assessment Test")
+    
+    mode = st.radio(
+        "Test mode:",
+        ("📋 Standard", "🎯 Adaptive"),
+        horizontal=True,
+        key="iq_mode",
+        help="Adaptive mode picks each question based on your previous answers and stops once your score is precise"
+    )
+    if mode == "🎯 Adaptive":
+        render_adaptive(bank)
+        return
+    
+    # Progress indicator
+    answers = st.session_state.get('iq_answers')
+    if not isinstance(answers, AnswerVector) or answers.size != len(bank):
+        st.session_state.iq_answers = AnswerVector(len(bank))
+    
+    progress = len(st.session_state.iq_answers) / len(bank) * 100
+    st.markdown(f"**Progress: {progress:.0f}% Complete**")
+    st.progress(progress / 100)
+    
+    st.markdown(f"""
+    <div class="test-card">
+        <p>This cognitive assessment evaluates your logical reasoning, pattern recognition, and problem-solving abilities. 
+        Take your time and think through each question carefully.</p>
+        <p><strong>⏱️ Estimated time:</strong> 10-15 minutes | <strong>📊 Questions:</strong> {len(bank)}</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Display questions with enhanced mobile design
+    if wizard_mode:
+        with metrics.span('iq', 'questions'):
+            show_results_button = render_wizard("iq_step", bank, render_question)
+    else:
+        with metrics.span('iq', 'questions'):
+            for i, q in enumerate(bank):
+                render_question(i, q, len(bank))
+        show_results_button = True
+    
+    # Enhanced results with personalized recommendations
+    if show_results_button and st.button("📊 Get My IQ Results", help="Calculate your cognitive assessment score"):
+        answers = {i: bank[i].options[code] for i, code in st.session_state.iq_answers.items()}
+        with metrics.span('iq', 'score'):
+            result = score_iq(answers, bank)
+        
+        # Save results to user profile
+        save_result('iq', {
+            'score': result['iq_estimate'],
+            'percentage': result['score_percentage'],
+            'date': datetime.datetime.now(),
+            'category_scores': result['category_scores'],
+            'weak_areas': result['weak_areas'],
+            'item_results': result['item_results']
+        })
+        
+        render_results(result)
+
+
+def render_adaptive(bank):
+    # Imported here so the standard test does not load numpy
+    from adaptive import AdaptiveTest, pool_for, score_adaptive
+
+    pool = pool_for(bank)
+    test = st.session_state.get('iq_adaptive')
+    if test is None or test.pool is not pool:
+        test = st.session_state.iq_adaptive = AdaptiveTest(pool)
+    
+    st.markdown(f"""
+    <div class="test-card">
+        <p>Each question is chosen from your previous answers, and the test stops as soon as
+        your score is estimated precisely enough.</p>
+        <p><strong>📊 Questions:</strong> {test.min_items}-{test.max_items} from a bank of {len(bank)}</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    served = len(test.administered)
+    st.progress(min(served / test.max_items, 1.0))
+    st.caption(f"Answered: {served} | Precision: ±{test.iq_margin:.0f} IQ points")
+    
+    item = test.next_item()
+    if item is not None:
+        q = bank[item]
+        st.markdown(f"### Question {served + 1}")
+        st.markdown(f"**Category:** {q.category} | **Difficulty:** {q.difficulty}")
+        st.markdown(f"**{q.question}**")
+        
+        with st.form(f"iq_adaptive_{served}"):
+            answer = st.radio("Select your answer:", q.options, key=f"iq_adaptive_q{served}")
+            if st.form_submit_button("Submit Answer ➡️"):
+                test.answer(item, answer == q.correct)
+                if test.finished:
+                    result = score_adaptive(test, bank)
+                    save_result('iq', {
+                        'score': result['iq_estimate'],
+                        'percentage': result['score_percentage'],
+                        'date': datetime.datetime.now(),
+                        'category_scores': result['category_scores'],
+                        'weak_areas': result['weak_areas'],
+                        'item_results': result['item_results'],
+                        'mode': 'adaptive',
+                        'theta': result['theta'],
+                        'standard_error': result['standard_error']
+                    })
+                st.rerun()
+    else:
+        render_results(score_adaptive(test, bank))
+        if st.button("🔄 Restart Adaptive Test"):
+            del st.session_state.iq_adaptive
+            st.rerun()
+
+
+def render_results(result):
+    correct_count = result['correct_count']
+    score_percentage = result['score_percentage']
+    iq_estimate = result['iq_estimate']
+    category_scores = result['category_scores']
+    
+    # Results display with better formatting
+    st.markdown("""
+    <div class="result-card">
+        <h2>🎉 Your Cognitive Assessment Results</h2>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Correct Answers", f"{correct_count}/{result['total']}")
+    with col2:
+        st.metric("Score Percentage", f"{score_percentage:.1f}%")
+    with col3:
+        st.metric("Estimated IQ", f"{iq_estimate:.0f}")
+    
+    # Category breakdown, sent as one element
+    st.markdown("### 📊 Performance by Category")
+    rows = []
+    for category, scores in category_scores.items():
+        percentage = (scores['correct'] / scores['total']) * 100
+        rows.append((category, f"{scores['correct']}/{scores['total']} ({percentage:.0f}%)", percentage))
+    st.markdown(breakdown_html(rows), unsafe_allow_html=True)
+    
+    # Personalized recommendations, pre-rendered per distinct outcome
+    with metrics.span('iq', 'recommendations'):
+        recommendations = results_markdown('iq', result, RESULT_SECTIONS)
+    st.markdown(recommendations, unsafe_allow_html=True)
@@ -0,0 +1,122 @@
+# Stress assessment with mental health recommendations
+
+import datetime
+
+import streamlit as st
+
+import metrics
+from catalog import STRESS_OPTIONS, breakdown_html
+from question_bank import stress_bank
+from scoring import score_stress, parse_stress_option
+from session import render_wizard, save_result, session_run, stream_results, sync_session
+from session_state import AnswerVector
+
+questions = stress_bank
+score = score_stress
+
+# Results page layout: (heading, recommendation section, optional)
+RESULT_SECTIONS = (
+    ("🎯 Personalized Stress Management Plan", 'plan', False),
+    ("🎯 Targeted Interventions", 'interventions', False),
+    ("🌟 Daily Stress Management Toolkit", 'toolkit', False),
+    ("🆘 Emergency Resources", 'emergency', True),
+)
+
+
+# Rendered as a fragment, so changing one answer only reruns this question
+@st.fragment
+def render_question(i, q, total):
+    with session_run(), st.container():
+        st.markdown(f"### Question {i+1}/{total}")
+        st.markdown(f"**Category:** {q.category} | **Impact Level:** {q.impact.title()}")
+        st.markdown(f"**{q.question}**")
+        
+        answer = st.selectbox(
+            "How often do you experience this?",
+            STRESS_OPTIONS,
+            index=st.session_state.stress_answers.get(i, 0),
+            key=f"stress_q{i+1}",
+            help=f"Consider the past 2 weeks when answering"
+        )
+        code = parse_stress_option(answer)
+        if st.session_state.stress_answers.get(i) != code:
+            st.session_state.stress_answers[i] = code
+            sync_session()
+        st.markdown("---")
+
+
+def render(wizard_mode=False):
+    bank = questions()
+    
+    st.markdown("## 😰 Comprehensive Stress Assessment")
+    
+    st.markdown(f"""
+    <div class="test-card">
+        <p>This assessment evaluates your current stress levels across multiple dimensions and provides personalized stress management strategies.</p>
+        <p><strong>⏱️ Time needed:</strong> 8-12 minutes | <strong>📊 Questions:</strong> {len(bank)} comprehensive questions</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Progress indicator
+    answers = st.session_state.get('stress_answers')
+    if not isinstance(answers, AnswerVector) or answers.size != len(bank):
+        st.session_state.stress_answers = AnswerVector(len(bank))
+    
+    progress = len(st.session_state.stress_answers) / len(bank) * 100
+    st.markdown(f"**Progress: {progress:.0f}% Complete**")
+    st.progress(progress / 100)
+    
+    # Display questions with categories
+    if wizard_mode:
+        with metrics.span('stress', 'questions'):
+            show_results_button = render_wizard("stress_step", bank, render_question)
+    else:
+        with metrics.span('stress', 'questions'):
+            for i, q in enumerate(bank):
+                render_question(i, q, len(bank))
+        show_results_button = True
+    
+    if show_results_button and st.button("📊 Get My Stress Assessment Results", help="Analyze your stress levels and get personalized recommendations"):
+        # Scored and rendered on the shared results pool; the page fills in as parts finish
+        answers = dict(st.session_state.stress_answers.items())
+        stream_results('stress', lambda: score_stress(answers, bank), RESULT_SECTIONS, show_summary)
+
+
+def show_summary(result):
+    total_stress = result['total_score']
+    max_stress = result['max_score']
+    stress_percentage = result['stress_percentage']
+    category_scores = result['category_scores']
+    
+    # Save results
+    save_result('stress', {
+        'total_score': total_stress,
+        'percentage': stress_percentage,
+        'level': result['level'],
+        'risk': result['risk'],
+        'category_scores': category_scores,
+        'date': datetime.datetime.now()
+    })
+    
+    # Results display
+    st.markdown("""
+    <div class="result-card">
+        <h2>📊 Your Stress Assessment Results</h2>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Overall results
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Total Score", f"{total_stress}/{max_stress}")
+    with col2:
+        st.metric("Stress Percentage", f"{stress_percentage:.1f}%")
+    with col3:
+        st.metric("Stress Level", result['level'])
+    
+    # Category breakdown, sent as one element
+    st.markdown("### 📊 Stress Breakdown by Category")
+    st.markdown(breakdown_html([
+        (category, f"{scores['average']:.1f}/4.0 ({scores['percentage']:.0f}%)", scores['percentage'])
+        for category, scores in category_scores.items()
+    ]), unsafe_allow_html=True)
@@ -0,0 +1,151 @@
+# Vectorized batch scoring for many respondents at once.
+# Uses the same thresholds as scoring.py so batch results never diverge
+# from what the app shows for a single submission.
+
+import numpy as np
+import pandas as pd
+
+from scoring import (
+    ACTIVITY_MULTIPLIERS,
+    BMI_BANDS,
+    GOAL_ADJUSTMENTS,
+    STRESS_LEVELS,
+    STRESS_MAX_PER_QUESTION,
+)
+
+# Cut points 16/17/18.5/25/30/35/40 (the last band is open-ended)
+BMI_CUT_POINTS = np.array([band[0] for band in BMI_BANDS[:-1]])
+BMI_CATEGORIES = np.array([band[1] for band in BMI_BANDS])
+BMI_HEALTH_STATUS = np.array([band[3] for band in BMI_BANDS])
+BMI_PRIORITIES = np.array([band[4] for band in BMI_BANDS])
+
+# Stress levels in ascending order for np.digitize
+STRESS_CUT_POINTS = np.array([minimum for minimum, _, _ in reversed(STRESS_LEVELS)][1:])
+STRESS_LEVEL_NAMES = np.array([level for _, level, _ in reversed(STRESS_LEVELS)])
+STRESS_RISKS = np.array([risk for _, _, risk in reversed(STRESS_LEVELS)])
+
+
+def _as_matrix(answers, n_questions):
+    # Accept a DataFrame (columns in question order) or any 2-D array-like
+    if isinstance(answers, pd.DataFrame):
+        index = answers.index
+        matrix = answers.to_numpy()
+    else:
+        matrix = np.asarray(answers)
+        index = pd.RangeIndex(len(matrix))
+    if matrix.ndim != 2 or matrix.shape[1] != n_questions:
+        raise ValueError(
+            f"Expected answers of shape (n, {n_questions}), got {matrix.shape}"
+        )
+    return matrix, index
+
+
+def _category_matrix(questions):
+    # One-hot (n_questions, n_categories) membership matrix, in first-seen order
+    categories = list(dict.fromkeys(q.category for q in questions))
+    membership = np.zeros((len(questions), len(categories)))
+    for i, q in enumerate(questions):
+        membership[i, categories.index(q.category)] = 1
+    return categories, membership
+
+
+def score_iq_batch(answers, questions):
+    """Score many IQ submissions; one row of chosen options per respondent."""
+    matrix, index = _as_matrix(answers, len(questions))
+    correct_options = np.array([q.correct for q in questions], dtype=object)
+    is_correct = (matrix.astype(object) == correct_options).astype(np.float64)
+
+    correct_count = is_correct.sum(axis=1)
+    score_percentage = correct_count / len(questions) * 100
+
+    result = pd.DataFrame({
+        'correct_count': correct_count.astype(np.int64),
+        'score_percentage': score_percentage,
+        'iq_estimate': 85 + score_percentage * 0.3,
+    }, index=index)
+
+    categories, membership = _category_matrix(questions)
+    category_correct = is_correct @ membership
+    category_total = membership.sum(axis=0)
+    for j, category in enumerate(categories):
+        result[f"{category} correct"] = category_correct[:, j].astype(np.int64)
+        result[f"{category} %"] = category_correct[:, j] / category_total[j] * 100
+    return result
+
+
+def score_bmi_batch(submissions):
+    """Score many BMI submissions.
+
+    `submissions` needs height (cm), weight (kg), age, activity_level and
+    health_goal columns.
+    """
+    df = pd.DataFrame(submissions)
+    height = df['height'].to_numpy(dtype=np.float64)
+    weight = df['weight'].to_numpy(dtype=np.float64)
+    age = df['age'].to_numpy(dtype=np.float64)
+
+    height_m = height / 100
+    bmi = weight / height_m ** 2
+    band = np.digitize(bmi, BMI_CUT_POINTS)
+
+    weight_goal = np.where(
+        bmi < 18.5, 18.5 * height_m ** 2 - weight,
+        np.where(bmi > 25, 22.5 * height_m ** 2 - weight, np.nan)
+    )
+
+    bmr_factor = np.select([age <= 30, age <= 50], [1.0, 0.95], default=0.9)
+    bmr = (10 * weight + 6.25 * height - 5 * age + 5) * bmr_factor
+    daily_calories = bmr * df['activity_level'].map(ACTIVITY_MULTIPLIERS).to_numpy()
+    target_calories = daily_calories + df['health_goal'].map(GOAL_ADJUSTMENTS).to_numpy()
+
+    return pd.DataFrame({
+        'bmi': bmi,
+        'category': BMI_CATEGORIES[band],
+        'health_status': BMI_HEALTH_STATUS[band],
+        'priority': BMI_PRIORITIES[band],
+        'weight_goal': weight_goal,
+        'bmr': bmr,
+        'daily_calories': daily_calories,
+        'target_calories': target_calories,
+        'protein_g': target_calories * 0.25 / 4,
+        'carbs_g': target_calories * 0.45 / 4,
+        'fats_g': target_calories * 0.30 / 9,
+        'water_l': weight * 35 / 1000,
+    }, index=df.index)
+
+
+def _stress_values(matrix):
+    # Option labels like "Often (3)" are parsed once per distinct label
+    if matrix.dtype.kind in 'iuf':
+        return np.nan_to_num(matrix.astype(np.float64))
+    labels, inverse = np.unique(matrix.astype(str), return_inverse=True)
+    labels = pd.Series(labels)
+    parsed = pd.to_numeric(labels.str.extract(r'\((\d+)\)\s*$')[0], errors='coerce')
+    values = parsed.fillna(pd.to_numeric(labels, errors='coerce')).fillna(0).to_numpy()
+    return values[inverse].reshape(matrix.shape)
+
+
+def score_stress_batch(answers, questions):
+    """Score many stress submissions; each row holds 0-4 scores or option labels."""
+    matrix, index = _as_matrix(answers, len(questions))
+    values = _stress_values(matrix)
+
+    total_stress = values.sum(axis=1)
+    max_stress = len(questions) * STRESS_MAX_PER_QUESTION
+    stress_percentage = total_stress / max_stress * 100
+    level = np.digitize(stress_percentage, STRESS_CUT_POINTS)
+
+    result = pd.DataFrame({
+        'total_score': total_stress.astype(np.int64),
+        'stress_percentage': stress_percentage,
+        'level': STRESS_LEVEL_NAMES[level],
+        'risk': STRESS_RISKS[level],
+    }, index=index)
+
+    categories, membership = _category_matrix(questions)
+    category_average = (values @ membership) / membership.sum(axis=0)
+    for j, category in enumerate(categories):
+        result[f"{category} avg"] = category_average[:, j]
+        result[f"{category} %"] = category_average[:, j] / STRESS_MAX_PER_QUESTION * 100
+    result['high_stress_count'] = (category_average / STRESS_MAX_PER_QUESTION * 100 >= 60).sum(axis=1)
+    return result
@@ -0,0 +1,311 @@
+# Load test: many simulated users taking assessments on a real server.
+#
+#   python benchmarks/load_test.py [--sessions 1,2,5,10,20,50] [--think 0]
+#                                  [--slo-ms 1000] [--output load.json]
+#                                  [--url ws://host:port --pid PID]
+#
+# Starts `streamlit run mindbody.py` on a free port (unless --url points at a
+# running server) and, for each step of the ramp, connects that many
+# simulated browsers at once over Streamlit's websocket protocol. Each
+# session opens the app, picks a test in the sidebar, answers every question
+# (or fills in the BMI form) and clicks the results button, timing every
+# rerun from the message it sends to the server's script_finished reply.
+# Every step reports p50/p95/p99 rerun latency, reruns per second, the error
+# rate and the server's resident memory per connected session (from /proc).
+# The ceiling is the last step before the first one with errors or a p95
+# over the SLO.
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from websockets.asyncio.client import connect
+
+# Also puts the app on sys.path and a scratch database in MINDBODY_DB
+from run_benchmarks import APP_PATH, ROOT, metadata
+from assessments import BY_KEY
+
+# Per test: results button label prefix
+RESULTS_BUTTONS = {
+    'iq': "📊 Get My IQ Results",
+    'bmi': "🔍 Calculate My BMI",
+    'stress': "📊 Get My Stress Assessment Results",
+}
+SIDEBAR_LABEL = "Choose Your Assessment:"
+FINISHED = (ForwardMsg.FINISHED_SUCCESSFULLY, ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY)
+# Distinct error messages kept per step
+MAX_ERRORS = 5
+
+
+class SimulatedUser:
+    """One browser session, speaking Streamlit's websocket protocol."""
+
+    def __init__(self, url, rng, timeout=60.0, think=0.0):
+        self.url = url
+        self.rng = rng
+        self.timeout = timeout
+        self.think = think
+        self.ws = None
+        self.query_string = ''
+        self.widgets = {}  # widget id -> (element type, proto, fragment id) on the page
+        self.values = {}   # widget id -> WidgetState the browser sends with every rerun
+        self.latencies = []
+        self.errors = []
+
+    async def take_assessment(self, test):
+        """Open the app and complete one test, leaving the session connected."""
+        try:
+            self.ws = await connect(f"{self.url}/_stcore/stream", subprotocols=["streamlit"], max_size=None)
+            await self.rerun()
+            await self.set(self.find(label=SIDEBAR_LABEL), string_value=BY_KEY[test].label)
+            if test == 'bmi':
+                height, weight, age = self.rng.randint(150, 195), self.rng.randint(50, 110), self.rng.randint(18, 70)
+                if any(widget_id.endswith("-bmi_preview") for widget_id in self.widgets):
+                    measurements = {'height': height, 'weight': weight, 'age': age}
+                    await self.set(self.find(key="bmi_preview"), json_value=json.dumps({'measurements': measurements}))
+                else:
+                    await self.set(self.find(label="Height (cm):"), double_value=height)
+                    await self.set(self.find(label="Weight (kg):"), double_value=weight)
+                    await self.set(self.find(label="Age:"), double_array_value={'data': [age]})
+                for label in ("Activity Level:", "Primary Health Goal:"):
+                    await self.set(self.find(label=label), string_value=self.choice(self.find(label=label)))
+            else:
+                for number in range(1, sum(f"-{test}_q" in widget_id for widget_id in self.widgets) + 1):
+                    widget_id = self.find(key=f"{test}_q{number}")
+                    await self.set(widget_id, string_value=self.choice(widget_id))
+            await self.click(RESULTS_BUTTONS[test])
+        except Exception as exc:
+            self.errors.append(f"{type(exc).__name__}: {exc}")
+
+    async def close(self):
+        if self.ws is not None:
+            await self.ws.close()
+
+    def find(self, key=None, label=None):
+        for widget_id, (_, proto, _) in self.widgets.items():
+            if (key is not None and widget_id.endswith(f"-{key}")) or (label is not None and getattr(proto, 'label', '').startswith(label)):
+                return widget_id
+        raise LookupError(f"No widget {key or label!r} on the page")
+
+    def choice(self, widget_id):
+        return self.rng.choice(self.widgets[widget_id][1].options)
+
+    async def set(self, widget_id, **value):
+        if self.think:
+            await asyncio.sleep(self.rng.uniform(0, self.think))
+        self.values[widget_id] = WidgetState(id=widget_id, **value)
+        # As in the browser: widgets in a form wait for its submit button, and
+        # widgets inside a fragment rerun only that fragment
+        if not getattr(self.widgets[widget_id][1], 'form_id', ''):
+            await self.rerun(self.widgets[widget_id][2])
+
+    async def click(self, label):
+        widget_id = self.find(label=label)
+        await self.rerun(self.widgets[widget_id][2], WidgetState(id=widget_id, trigger_value=True))
+
+    async def rerun(self, fragment_id='', trigger=None):
+        msg = BackMsg()
+        msg.rerun_script.query_string = self.query_string
+        msg.rerun_script.widget_states.widgets.extend(list(self.values.values()) + ([trigger] if trigger else []))
+        if fragment_id:
+            msg.rerun_script.fragment_id = fragment_id
+        started = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        widgets = await asyncio.wait_for(self._read_run(), self.timeout)
+        self.latencies.append(time.perf_counter() - started)
+
+        if fragment_id:
+            self.widgets.update(widgets)
+        else:
+            self.widgets = widgets
+            self.values = {widget_id: value for widget_id, value in self.values.items() if widget_id in widgets}
+
+    async def _read_run(self):
+        # Collect the run's widgets until script_finished
+        widgets = {}
+        while True:
+            msg = ForwardMsg()
+            msg.ParseFromString(await self.ws.recv())
+            kind = msg.WhichOneof('type')
+            if kind == 'page_info_changed':
+                self.query_string = msg.page_info_changed.query_string
+            elif kind == 'delta' and msg.delta.WhichOneof('type') == 'new_element':
+                element = msg.delta.new_element
+                element_type = element.WhichOneof('type')
+                proto = getattr(element, element_type)
+                if element_type == 'exception':
+                    self.errors.append(f"{proto.type}: {proto.message}")
+                elif getattr(proto, 'id', ''):
+                    widgets[proto.id] = (element_type, proto, msg.delta.fragment_id)
+            elif kind == 'script_finished':
+                if msg.script_finished not in FINISHED:
+                    self.errors.append(f"script finished with {ForwardMsg.ScriptFinishedStatus.Name(msg.script_finished)}")
+                return widgets
+
+
+def percentiles(samples):
+    if not samples:
+        return {}
+    cuts = statistics.quantiles(samples, n=100, method='inclusive') if len(samples) > 1 else samples * 99
+    return {
+        'p50_ms': cuts[49] * 1000,
+        'p95_ms': cuts[94] * 1000,
+        'p99_ms': cuts[98] * 1000,
+        'max_ms': max(samples) * 1000,
+    }
+
+
+def rss_kb(pid):
+    # Resident set size of the server process, or None off Linux
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as f:
+            return next(int(line.split()[1]) for line in f if line.startswith("VmRSS:"))
+    except (OSError, StopIteration, TypeError):
+        return None
+
+
+async def run_step(url, sessions, seed, think, timeout, pid):
+    rng = random.Random(seed)
+    users = [SimulatedUser(url, random.Random(rng.random()), timeout, think) for _ in range(sessions)]
+    tests = [rng.choice(tuple(RESULTS_BUTTONS)) for _ in users]
+    rss_before = rss_kb(pid)
+    started = time.perf_counter()
+    await asyncio.gather(*(user.take_assessment(test) for user, test in zip(users, tests)))
+    elapsed = time.perf_counter() - started
+    # Measured while every session is still connected
+    rss_after = rss_kb(pid)
+    await asyncio.gather(*(user.close() for user in users))
+
+    latencies = [latency for user in users for latency in user.latencies]
+    errors = [error for user in users for error in user.errors]
+    return {
+        'sessions': sessions,
+        'tests': {test: tests.count(test) for test in RESULTS_BUTTONS},
+        'reruns': len(latencies),
+        'seconds': elapsed,
+        'reruns_per_second': len(latencies) / elapsed,
+        'latency': percentiles(latencies),
+        'error_rate': sum(1 for user in users if user.errors) / sessions,
+        'errors': sorted(set(errors))[:MAX_ERRORS],
+        'server_rss_mb': None if rss_after is None else rss_after / 1024,
+        'rss_per_session_kb': None if rss_after is None else (rss_after - rss_before) / sessions,
+    }
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port, wait=60.0):
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", APP_PATH, f"--server.port={port}",
+         "--server.address=127.0.0.1", "--server.headless=true", "--server.fileWatcherType=none",
+         "--browser.gatherUsageStats=false"],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with {server.returncode}:\n{server.stderr.read()}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1):
+                return server
+        except OSError:
+            time.sleep(0.25)
+    server.kill()
+    raise RuntimeError(f"Server did not become healthy within {wait:.0f}s")
+
+
+def print_step(step):
+    latency = step['latency']
+    rss = step['rss_per_session_kb']
+    print(
+        f"{step['sessions']:>8} {step['reruns_per_second']:>10.1f} "
+        f"{latency.get('p50_ms', 0):>9.0f} {latency.get('p95_ms', 0):>9.0f} {latency.get('p99_ms', 0):>9.0f} "
+        f"{step['error_rate'] * 100:>7.1f}% {'-' if rss is None else f'{rss:.0f}':>12}"
+    )
+    for error in step['errors']:
+        print(f"{'':>8} ! {error}")
+
+
+async def ramp(url, steps, seed, think, timeout, pid):
+    # One untimed session first, so imports and caches are warm
+    await run_step(url, 1, seed - 1, 0.0, timeout, pid)
+    baseline = rss_kb(pid)
+    print(f"{'sessions':>8} {'reruns/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>8} {'RSS/session':>12}")
+    results = []
+    for sessions in steps:
+        step = await run_step(url, sessions, seed + sessions, think, timeout, pid)
+        print_step(step)
+        results.append(step)
+    return baseline, results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ramp simulated users against a mindbody server")
+    parser.add_argument("--sessions", default="1,2,5,10,20,50", help="comma-separated concurrent sessions per step")
+    parser.add_argument("--think", type=float, default=0.0, help="max random seconds between a user's actions")
+    parser.add_argument("--slo-ms", type=float, default=1000.0, help="p95 rerun latency a step must stay under")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds before a rerun counts as failed")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--url", help="ws://host:port of a running server (default: start one)")
+    parser.add_argument("--pid", type=int, help="process id of the --url server, for its memory use")
+    parser.add_argument("--output", help="where to save results (default: benchmarks/results/load-<timestamp>.json)")
+    args = parser.parse_args(argv)
+    steps = [int(step) for step in args.sessions.split(",")]
+
+    server = None
+    if args.url:
+        url, pid = args.url.rstrip("/"), args.pid
+    else:
+        port = free_port()
+        server = start_server(port)
+        url, pid = f"ws://127.0.0.1:{port}", server.pid
+    try:
+        baseline, results = asyncio.run(ramp(url, steps, args.seed, args.think, args.timeout, pid))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    # The last step before the first one with errors or over the SLO
+    ceiling = 0
+    for step in results:
+        if step['error_rate'] or step['latency'].get('p95_ms', 0) > args.slo_ms:
+            break
+        ceiling = step['sessions']
+    report = {
+        'meta': metadata(),
+        'settings': {'think_seconds': args.think, 'slo_p95_ms': args.slo_ms, 'seed': args.seed},
+        'server_rss_baseline_mb': None if baseline is None else baseline / 1024,
+        'steps': results,
+        'ceiling_sessions': ceiling,
+    }
+
+    output = args.output or os.path.join(
+        ROOT, "benchmarks", "results",
+        f"load-{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nCeiling: {report['ceiling_sessions']} concurrent sessions with p95 <= {args.slo_ms:.0f} ms and no errors")
+    print(f"Saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+# Benchmark suite for page rerun cost and scoring throughput.
+#
+#   python benchmarks/run_benchmarks.py [--repeat 20] [--output results.json]
+#                                       [--compare previous.json]
+#
+# Rerun timings drive mindbody.py through Streamlit's AppTest harness; the
+# scoring microbenchmarks call the scoring engine directly. Results are saved
+# as JSON so runs from different versions can be compared.
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+APP_PATH = os.path.join(ROOT, "mindbody.py")
+
+# Keep benchmark results out of the real database
+os.environ.setdefault("MINDBODY_DB", os.path.join(tempfile.mkdtemp(), "bench.db"))
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {
+        'runs': len(samples),
+        'min_ms': samples[0] * 1000,
+        'median_ms': statistics.median(samples) * 1000,
+        'p95_ms': samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000,
+        'max_ms': samples[-1] * 1000,
+    }
+
+
+def timed(action):
+    start = time.perf_counter()
+    action()
+    return time.perf_counter() - start
+
+
+def find_button(at, prefix):
+    return next(button for button in at.button if button.label.startswith(prefix))
+
+
+# Per page: (sidebar label, answer-change action, results button prefix)
+PAGES = {
+    'home': ("🏠 Home", None, None),
+    'iq': ("🧮 IQ Test",
+           lambda at: at.radio(key="iq_q1").set_value(at.radio(key="iq_q1").options[1]).run(),
+           "📊 Get My IQ Results"),
+    # BMI inputs are a form with a browser-side preview: editing them reruns nothing
+    'bmi': ("⚖️ BMI & Nutrition", None, "🔍 Calculate My BMI"),
+    'stress': ("😰 Stress Assessment",
+               lambda at: at.selectbox(key="stress_q1").select("Often (3)").run(),
+               "📊 Get My Stress Assessment Results"),
+}
+
+
+def bench_reruns(repeat):
+    from streamlit.testing.v1 import AppTest
+
+    results = {}
+    for page, (label, change_answer, results_button) in PAGES.items():
+        timings = {'page_load': [], 'answer_change': [], 'results': []}
+        for _ in range(repeat):
+            at = AppTest.from_file(APP_PATH, default_timeout=60)
+            at.run()
+            timings['page_load'].append(timed(lambda: at.sidebar.selectbox[0].select(label).run()))
+            if change_answer is not None:
+                timings['answer_change'].append(timed(lambda: change_answer(at)))
+            if results_button is not None:
+                timings['results'].append(timed(lambda: find_button(at, results_button).click().run()))
+            if at.exception:
+                raise RuntimeError(f"{page}: {at.exception[0].value}")
+        results[page] = {name: summarize(samples) for name, samples in timings.items() if samples}
+    return results
+
+
+def bench_cold_start(repeat):
+    # First script run in a fresh interpreter, as on a new replica. Streamlit
+    # is imported before the run (the server has it loaded already); the
+    # timings come from the startup profile line mindbody.py logs.
+    code = (
+        "from streamlit.testing.v1 import AppTest; "
+        f"AppTest.from_file({APP_PATH!r}, default_timeout=60).run()"
+    )
+    env = dict(os.environ, MINDBODY_PROFILE="1")
+    timings = {'script_run': [], 'imports': []}
+    for _ in range(max(3, repeat // 4)):
+        proc = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+        match = re.search(r"startup profile \(cold, (\d+) ms\): imports @0 \+(\d+)", proc.stderr)
+        if match is None:
+            raise RuntimeError(f"No startup profile in output:\n{proc.stderr}")
+        timings['script_run'].append(int(match[1]) / 1000)
+        timings['imports'].append(int(match[2]) / 1000)
+    return {name: summarize(samples) for name, samples in timings.items()}
+
+
+def bench_scoring(repeat):
+    from catalog import STRESS_OPTIONS
+    from question_bank import iq_bank, stress_bank
+    from scoring import ACTIVITY_MULTIPLIERS, GOAL_ADJUSTMENTS, score_bmi, score_iq, score_stress
+
+    rng = random.Random(42)
+    iq = iq_bank()
+    stress = stress_bank()
+    iq_answers = {i: rng.choice(q.options) for i, q in enumerate(iq)}
+    stress_answers = {i: rng.randrange(len(STRESS_OPTIONS)) for i in range(len(stress))}
+    activity = list(ACTIVITY_MULTIPLIERS)[2]
+    goal = list(GOAL_ADJUSTMENTS)[1]
+
+    cases = {
+        'score_iq': lambda: score_iq(iq_answers, iq),
+        'score_bmi': lambda: score_bmi(172, 81, 34, activity, goal),
+        'score_stress': lambda: score_stress(stress_answers, stress),
+    }
+    results = {}
+    for name, case in cases.items():
+        number = 2000
+        runs = timeit.repeat(case, number=number, repeat=max(3, repeat // 4))
+        best = min(runs) / number
+        results[name] = {'best_us': best * 1e6, 'per_second': 1 / best}
+    return results
+
+
+def bench_batch_scoring(rows=100000):
+    import numpy as np
+    from batch_scoring import score_bmi_batch, score_iq_batch, score_stress_batch
+    from question_bank import iq_bank, stress_bank
+    from scoring import ACTIVITY_MULTIPLIERS, GOAL_ADJUSTMENTS
+
+    rng = np.random.default_rng(42)
+    iq = iq_bank()
+    stress = stress_bank()
+    iq_answers = np.array([rng.choice(q.options, rows) for q in iq]).T
+    stress_answers = rng.integers(0, 5, (rows, len(stress)))
+    bmi = {
+        'height': rng.integers(100, 250, rows),
+        'weight': rng.integers(30, 200, rows),
+        'age': rng.integers(13, 100, rows),
+        'activity_level': rng.choice(list(ACTIVITY_MULTIPLIERS), rows),
+        'health_goal': rng.choice(list(GOAL_ADJUSTMENTS), rows),
+    }
+
+    results = {}
+    for name, case in {
+        'score_iq_batch': lambda: score_iq_batch(iq_answers, iq),
+        'score_bmi_batch': lambda: score_bmi_batch(bmi),
+        'score_stress_batch': lambda: score_stress_batch(stress_answers, stress),
+    }.items():
+        best = min(timeit.repeat(case, number=1, repeat=3))
+        results[name] = {'rows': rows, 'seconds': best, 'rows_per_second': rows / best}
+    return results
+
+
+def metadata():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True
+        ).stdout.strip()
+    except OSError:
+        commit = None
+    import streamlit
+    return {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': commit or None,
+        'python': platform.python_version(),
+        'streamlit': streamlit.__version__,
+        'platform': platform.platform(),
+    }
+
+
+def compare(current, previous, path=()):
+    # Print every timing that moved by more than 10% between two runs
+    for key, value in current.items():
+        old = previous.get(key) if isinstance(previous, dict) else None
+        if isinstance(value, dict):
+            compare(value, old or {}, path + (key,))
+        elif key in ('median_ms', 'best_us', 'seconds') and isinstance(old, (int, float)) and old:
+            change = (value - old) / old * 100
+            flag = "  <-- slower" if change > 10 else ("  faster" if change < -10 else "")
+            print(f"{'.'.join(path + (key,)):55s} {old:10.3f} -> {value:10.3f} ({change:+.0f}%){flag}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark mindbody reruns and scoring")
+    parser.add_argument("--repeat", type=int, default=20, help="runs per rerun benchmark")
+    parser.add_argument("--output", help="where to save results (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="previous results JSON to compare against")
+    parser.add_argument("--skip-reruns", action="store_true", help="only run the scoring benchmarks")
+    args = parser.parse_args(argv)
+
+    report = {'meta': metadata()}
+    if not args.skip_reruns:
+        report['cold_start'] = bench_cold_start(args.repeat)
+        report['reruns'] = bench_reruns(args.repeat)
+    report['scoring'] = bench_scoring(args.repeat)
+    report['batch_scoring'] = bench_batch_scoring()
+
+    output = args.output or os.path.join(
+        ROOT, "benchmarks", "results",
+        f"{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+    print(f"\nSaved to {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)
+        print(f"\nChanges vs {args.compare}:")
+        compare(report, previous)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+# Live BMI preview for the BMI page.
+# Height, weight and age are entered in a custom component that computes the
+# BMI and its category band in the browser as the user types, with the same
+# bands as scoring.BMI_BANDS. It sits inside the page's st.form, so nothing
+# reaches the server until the form is submitted. Without custom components
+# (Streamlit before st.components.v2) the form falls back to plain inputs.
+
+import streamlit as st
+
+from scoring import BMI_BANDS
+
+try:
+    from streamlit.components.v2 import component, get_bidi_component_manager
+except ImportError:
+    component = None
+
+COMPONENT = "bmi_preview"
+
+# name: (label, min, max, default, help)
+MEASUREMENTS = {
+    'height': ("Height (cm):", 100, 250, 170, "Enter your height in centimeters"),
+    'weight': ("Weight (kg):", 30, 200, 70, "Enter your current weight in kilograms"),
+    'age': ("Age:", 13, 100, 25, None),
+}
+
+HTML = """
+<div class="bmi-preview">
+    <label>Height (cm) <input name="height" type="number" step="1" inputmode="numeric"></label>
+    <label>Weight (kg) <input name="weight" type="number" step="1" inputmode="numeric"></label>
+    <label>Age: <output class="age-value"></output> <input name="age" type="range" step="1"></label>
+    <div class="bmi-result" aria-live="polite">
+        <span class="bmi-value"></span>
+        <span class="bmi-band"></span>
+    </div>
+</div>
+"""
+
+CSS = """
+.bmi-preview { display: grid; gap: 0.75rem; font-family: inherit; color: var(--st-text-color, inherit); }
+.bmi-preview label { display: grid; gap: 0.25rem; font-size: 0.9rem; }
+.bmi-preview input[type=number] {
+    font: inherit; padding: 0.5rem; border-radius: 0.5rem;
+    border: 1px solid var(--st-border-color, #d0d3da);
+    background: var(--st-secondary-background-color, #f0f2f6); color: inherit;
+}
+.bmi-result {
+    padding: 0.75rem 1rem; border-radius: 0.5rem; border-left: 0.4rem solid gray;
+    background: var(--st-secondary-background-color, #f0f2f6);
+}
+.bmi-value { font-size: 1.6rem; font-weight: 700; margin-right: 0.75rem; }
+.bmi-result.red { border-left-color: #e74c3c; }
+.bmi-result.orange { border-left-color: #f39c12; }
+.bmi-result.yellow { border-left-color: #f1c40f; }
+.bmi-result.green { border-left-color: #27ae60; }
+"""
+
+# Runs on every render; only the first one fills in the inputs, so the
+# user's typing is never overwritten. The preview updates on every keystroke
+# in the browser; committed values (Enter, leaving a field, releasing the
+# slider) are queued in the form and sent when it is submitted.
+JS = """
+export default function ({ data, parentElement, setStateValue }) {
+    const root = parentElement.querySelector('.bmi-preview');
+    const inputs = Object.fromEntries(
+        Object.keys(data.limits).map((name) => [name, root.querySelector(`[name=${name}]`)])
+    );
+    if (!root.dataset.ready) {
+        root.dataset.ready = '1';
+        for (const [name, input] of Object.entries(inputs)) {
+            [input.min, input.max] = data.limits[name];
+            input.value = data.values[name];
+        }
+    }
+
+    const read = () => {
+        const values = {};
+        for (const [name, input] of Object.entries(inputs)) {
+            const value = Number(input.value);
+            const [low, high] = data.limits[name];
+            if (input.value === '' || !(value >= low && value <= high)) {
+                return null;
+            }
+            values[name] = value;
+        }
+        return values;
+    };
+
+    const show = () => {
+        const values = read();
+        const result = root.querySelector('.bmi-result');
+        root.querySelector('.age-value').textContent = inputs.age.value;
+        if (values === null) {
+            result.className = 'bmi-result';
+            root.querySelector('.bmi-value').textContent = '–';
+            root.querySelector('.bmi-band').textContent = 'Enter a height and weight within range';
+            return;
+        }
+        const bmi = values.weight / (values.height / 100) ** 2;
+        const [, category, color] = data.bands.find(([upper]) => upper === null || bmi < upper);
+        result.className = `bmi-result ${color}`;
+        root.querySelector('.bmi-value').textContent = `BMI ${bmi.toFixed(1)}`;
+        root.querySelector('.bmi-band').textContent = category;
+    };
+
+    root.oninput = show;
+    root.onchange = () => {
+        const values = read();
+        if (values !== null) {
+            setStateValue('measurements', values);
+        }
+    };
+    show();
+}
+"""
+
+_preview = None
+
+
+def _mount_preview(**kwargs):
+    # Registered on first use with each runtime (every AppTest has its own)
+    global _preview
+    if _preview is None or get_bidi_component_manager().get(COMPONENT) is None:
+        _preview = component(COMPONENT, html=HTML, css=CSS, js=JS)
+    return _preview(**kwargs)
+
+
+def measurement_inputs(age):
+    """Height (cm), weight (kg) and age for the BMI form; call inside an st.form."""
+    if component is None:
+        return tuple(
+            st.slider(label, low, high, age, help=help_text) if name == 'age'
+            else st.number_input(label, min_value=low, max_value=high, value=default, help=help_text)
+            for name, (label, low, high, default, help_text) in MEASUREMENTS.items()
+        )
+
+    values = {name: age if name == 'age' else default for name, (_, _, _, default, _) in MEASUREMENTS.items()}
+    result = _mount_preview(
+        key=COMPONENT,
+        data={
+            'values': values,
+            'limits': {name: (low, high) for name, (_, low, high, _, _) in MEASUREMENTS.items()},
+            'bands': [(None if upper == float('inf') else upper, category, color)
+                      for upper, category, color, _, _ in BMI_BANDS],
+        },
+        default={'measurements': values},
+        on_measurements_change=lambda: None,
+    )
+    # Values come from the browser, so they are checked again here
+    submitted = result.measurements if isinstance(result.measurements, dict) else {}
+    return tuple(_clamp(submitted.get(name), low, high, values[name])
+                 for name, (_, low, high, _, _) in MEASUREMENTS.items())
+
+
+def _clamp(value, low, high, default):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return default
+    return min(max(value, low), high) if value == value else default
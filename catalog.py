@@ -0,0 +1,206 @@
+# Static catalog for the assessment app: question/card record types, answer
+# options and the page CSS. Everything here is built once when the module is
+# first imported and is immutable, so Streamlit reruns reuse the same objects
+# instead of rebuilding them for every widget interaction. The question banks
+# themselves are loaded from data files by question_bank.py.
+
+import html
+from dataclasses import dataclass
+
+from scoring import ACTIVITY_MULTIPLIERS, GOAL_ADJUSTMENTS
+
+
+@dataclass(frozen=True, slots=True)
+class IQQuestion:
+    question: str
+    options: tuple
+    correct: str
+    category: str
+    difficulty: str
+    # Optional 2PL IRT parameters (discrimination a, difficulty b) used by
+    # adaptive testing; b defaults from the difficulty label when missing
+    irt_a: float = 1.0
+    irt_b: float = None
+    # Stable id for per-question statistics (positions change when the bank
+    # is edited); derived from the question text when the file has none
+    id: str = None
+
+
+@dataclass(frozen=True, slots=True)
+class StressQuestion:
+    question: str
+    category: str
+    impact: str
+
+
+@dataclass(frozen=True, slots=True)
+class TestInfo:
+    title: str
+    description: str
+    features: tuple
+    time: str
+    difficulty: str
+
+    @property
+    def card_html(self):
+        features = ''.join(f'<li>✓ {feature}</li>' for feature in self.features)
+        return f"""
+        <div class="test-card">
+            <h3>{self.title}</h3>
+            <p>{self.description}</p>
+            <ul>
+                {features}
+            </ul>
+            <p><strong>{self.time}</strong> | <strong>{self.difficulty}</strong></p>
+        </div>
+        """
+
+
+STRESS_OPTIONS = (
+    "Never (0)",
+    "Rarely (1)",
+    "Sometimes (2)",
+    "Often (3)",
+    "Very Often (4)",
+)
+
+# Selectbox choices for the BMI page
+ACTIVITY_LEVELS = tuple(ACTIVITY_MULTIPLIERS)
+HEALTH_GOALS = tuple(GOAL_ADJUSTMENTS)
+DIETARY_OPTIONS = (
+    "None", "Vegetarian", "Vegan", "Gluten-free", "Dairy-free",
+    "Low-carb", "Keto", "Mediterranean", "Diabetic-friendly",
+)
+
+# Custom CSS for responsive design and better mobile experience
+PAGE_CSS = """
+<style>
+    /* Mobile-first responsive design */
+    @media (max-width: 768px) {
+        .main .block-container {
+            padding-left: 1rem !important;
+            padding-right: 1rem !important;
+            max-width: 100% !important;
+        }
+        
+        .stSelectbox > div > div {
+            font-size: 14px;
+        }
+        
+        .stRadio > div {
+            flex-direction: column;
+        }
+        
+        .stButton > button {
+            width: 100%;
+            margin: 0.5rem 0;
+        }
+        
+        .stColumns {
+            flex-direction: column !important;
+        }
+        
+        .stColumns > div {
+            width: 100% !important;
+            margin-bottom: 1rem;
+        }
+        
+        .meal-grid {
+            grid-template-columns: 1fr !important;
+        }
+    }
+    
+    /* Better visual hierarchy */
+    .main-header {
+        background: linear-gradient(90deg, #667eea 0%, #764ba2 100%);
+        padding: 1rem;
+        border-radius: 10px;
+        color: white;
+        text-align: center;
+        margin-bottom: 2rem;
+    }
+    
+    .test-card {
+        background: #f8f9fa;
+        padding: 1.5rem;
+        border-radius: 10px;
+        border-left: 4px solid #667eea;
+        margin: 1rem 0;
+        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+    }
+    
+    .result-card {
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        padding: 1.5rem;
+        border-radius: 10px;
+        color: white;
+        margin: 1rem 0;
+    }
+    
+    .improvement-card {
+        background: #e8f5e8;
+        padding: 1rem;
+        border-radius: 8px;
+        border-left: 4px solid #28a745;
+        margin: 0.5rem 0;
+    }
+    
+    .warning-card {
+        background: #fff3cd;
+        padding: 1rem;
+        border-radius: 8px;
+        border-left: 4px solid #ffc107;
+        margin: 0.5rem 0;
+    }
+    
+    .meal-grid {
+        display: grid;
+        grid-template-columns: repeat(4, 1fr);
+        gap: 1rem;
+        margin: 0.5rem 0;
+    }
+    
+    /* Progress indicators */
+    .progress-container {
+        background: #e9ecef;
+        border-radius: 10px;
+        height: 8px;
+        margin: 1rem 0;
+    }
+    
+    .progress-bar {
+        height: 100%;
+        border-radius: 10px;
+        background: #667eea;
+        transition: width 0.3s ease;
+    }
+    
+    /* Mobile navigation improvements */
+    .stSidebar {
+        background-color: #f8f9fa;
+    }
+    
+    .stSidebar .stSelectbox {
+        background-color: white;
+        border-radius: 5px;
+    }
+</style>
+"""
+
+# Main header with responsive design
+HEADER_HTML = """
+<div class="main-header">
+    <h1>🧠 Personal Assessment Tests</h1>
+    <p>Discover insights about yourself with our comprehensive assessment suite</p>
+</div>
+"""
+
+
+def breakdown_html(rows):
+    """Per-category results as one HTML block: (category, detail, percentage) rows."""
+    return '<div class="breakdown">' + ''.join(
+        f'<p><strong>{html.escape(category)}:</strong> {detail}</p>'
+        f'<div class="progress-container"><div class="progress-bar" '
+        f'style="width: {min(max(percentage, 0), 100):.0f}%"></div></div>'
+        for category, detail, percentage in rows
+    ) + '</div>'
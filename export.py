@@ -0,0 +1,253 @@
+# Export stored results for offline analysis (Parquet, Arrow IPC or CSV).
+# Rows are read from SQLite in batches and written one batch at a time (one
+# Parquet row group / Arrow record batch / CSV chunk per batch), so memory
+# use depends on the batch size, never on how many results are stored.
+#
+#   python export.py --format parquet --output results.parquet
+#   python export.py --format csv --output - --test stress --since 2025-01-01 > stress.csv
+#
+# The app uses the same functions for the per-user download buttons.
+
+import argparse
+import csv
+import datetime
+import io
+import json
+import sys
+import time
+
+from assessments import BY_KEY
+from question_bank import iq_bank, stress_bank
+from storage import DEFAULT_DB_PATH, connect
+
+BATCH_SIZE = 65536
+FORMATS = ('parquet', 'arrow', 'csv')
+MIME_TYPES = {
+    'parquet': 'application/vnd.apache.parquet',
+    'arrow': 'application/vnd.apache.arrow.file',
+    'csv': 'text/csv',
+}
+
+# (column, arrow type, result field) read straight from the stored result
+RESULT_FIELDS = (
+    ('age', 'int64', 'age'),
+    ('percentage', 'float64', 'percentage'),
+    ('bmi', 'float64', 'bmi'),
+    ('category', 'string', 'category'),
+    ('health_goal', 'string', 'health_goal'),
+    ('activity_level', 'string', 'activity_level'),
+    ('total_score', 'float64', 'total_score'),
+    ('level', 'string', 'level'),
+    ('risk', 'string', 'risk'),
+    ('mode', 'string', 'mode'),
+    ('theta', 'float64', 'theta'),
+    ('standard_error', 'float64', 'standard_error'),
+)
+
+
+def _slug(name):
+    return ''.join(c if c.isalnum() else '_' for c in name.lower()).strip('_')
+
+
+def columns():
+    """[(column, arrow type)] in export order.
+
+    Besides the common and per-test fields, category breakdowns get one
+    column per category of the current question banks; the full breakdown
+    is also kept as JSON in category_scores.
+    """
+    cols = [
+        ('result_id', 'int64'), ('user_id', 'string'), ('test_type', 'string'),
+        ('created_at', 'timestamp'), ('score', 'float64'), ('label', 'string'),
+    ]
+    cols += [(name, kind) for name, kind, _ in RESULT_FIELDS]
+    for category in iq_bank().categories:
+        cols += [(f'iq_{_slug(category)}_correct', 'int64'), (f'iq_{_slug(category)}_total', 'int64')]
+    for category in stress_bank().categories:
+        cols.append((f'stress_{_slug(category)}_pct', 'float64'))
+    cols.append(('category_scores', 'string'))
+    return cols
+
+
+def _number(value, kind):
+    if value is None or kind == 'string':
+        return value
+    try:
+        return int(value) if kind == 'int64' else float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _row(cols, result_id, user_id, test_type, created_at, payload):
+    result = json.loads(payload)
+    assessment = BY_KEY.get(test_type)
+    values = {
+        'result_id': result_id,
+        'user_id': user_id,
+        'test_type': test_type,
+        'created_at': created_at,
+        'score': _number(result.get(assessment.score_field), 'float64') if assessment else None,
+        'label': result.get(assessment.label_field) if assessment and assessment.label_field else None,
+    }
+    for name, kind, field in RESULT_FIELDS:
+        value = result.get(field)
+        values[name] = str(value) if kind == 'string' and value is not None else _number(value, kind)
+
+    breakdown = result.get('category_scores') or {}
+    for category, scores in breakdown.items():
+        if test_type == 'iq':
+            values[f'iq_{_slug(category)}_correct'] = scores.get('correct')
+            values[f'iq_{_slug(category)}_total'] = scores.get('total')
+        elif test_type == 'stress':
+            values[f'stress_{_slug(category)}_pct'] = scores.get('percentage')
+    values['category_scores'] = json.dumps(breakdown, ensure_ascii=False) if breakdown else None
+    return [values.get(name) for name, _ in cols]
+
+
+def iter_batches(path=DEFAULT_DB_PATH, user_id=None, test_type=None, since=None, until=None,
+                 batch_size=BATCH_SIZE, cols=None):
+    """Yield results as column dicts {column: [values]} of at most batch_size rows.
+
+    since/until are datetimes, dates or POSIX timestamps (until is exclusive).
+    """
+    cols = cols or columns()
+    query = "SELECT id, user_id, test_type, created_at, payload FROM results"
+    clauses, params = [], []
+    for clause, value in (("user_id = ?", user_id), ("test_type = ?", test_type),
+                          ("created_at >= ?", _timestamp(since)), ("created_at < ?", _timestamp(until))):
+        if value is not None:
+            clauses.append(clause)
+            params.append(value)
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    query += " ORDER BY id"
+
+    conn = connect(path)
+    try:
+        cursor = conn.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            values = [_row(cols, *row) for row in rows]
+            yield {name: [row[i] for row in values] for i, (name, _) in enumerate(cols)}
+    finally:
+        conn.close()
+
+
+def _timestamp(value):
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if not isinstance(value, datetime.datetime):
+        value = datetime.datetime.combine(value, datetime.time())
+    return value.timestamp()
+
+
+def arrow_schema(cols):
+    import pyarrow as pa
+    types = {
+        'int64': pa.int64(), 'float64': pa.float64(), 'string': pa.string(),
+        'timestamp': pa.timestamp('us', tz='UTC'),
+    }
+    return pa.schema([(name, types[kind]) for name, kind in cols])
+
+
+def _record_batch(batch, schema):
+    import pyarrow as pa
+    batch['created_at'] = [round(t * 1_000_000) for t in batch['created_at']]
+    return pa.RecordBatch.from_pydict(batch, schema=schema)
+
+
+def write_parquet(sink, batches, cols):
+    """Write batches to a Parquet file (path or binary file), one row group each."""
+    import pyarrow.parquet as pq
+    schema = arrow_schema(cols)
+    with pq.ParquetWriter(sink, schema, compression='zstd') as writer:
+        for batch in batches:
+            writer.write_batch(_record_batch(batch, schema))
+
+
+def write_arrow(sink, batches, cols):
+    """Write batches to an Arrow IPC file (path or binary file)."""
+    import pyarrow as pa
+    schema = arrow_schema(cols)
+    with pa.ipc.new_file(sink, schema) as writer:
+        for batch in batches:
+            writer.write_batch(_record_batch(batch, schema))
+
+
+def iter_csv(batches, cols):
+    """Yield CSV text: the header, then one chunk per batch."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([name for name, _ in cols])
+    for batch in batches:
+        batch['created_at'] = [
+            datetime.datetime.fromtimestamp(t, datetime.timezone.utc).isoformat() for t in batch['created_at']
+        ]
+        writer.writerows(zip(*(batch[name] for name, _ in cols)))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def export_bytes(fmt, path=DEFAULT_DB_PATH, **filters):
+    """One export as bytes; for small exports such as a single user's results."""
+    cols = columns()
+    batches = iter_batches(path, cols=cols, **filters)
+    if fmt == 'csv':
+        return ''.join(iter_csv(batches, cols)).encode('utf-8')
+    sink = io.BytesIO()
+    writer = write_parquet if fmt == 'parquet' else write_arrow
+    writer(sink, batches, cols)
+    return sink.getvalue()
+
+
+def _date(text):
+    return datetime.datetime.fromisoformat(text)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export stored assessment results")
+    parser.add_argument("--format", choices=FORMATS, default='parquet')
+    parser.add_argument("--output", required=True, help="output file ('-' for stdout)")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="results database")
+    parser.add_argument("--test", choices=tuple(BY_KEY), help="only this test type")
+    parser.add_argument("--user", help="only this user id")
+    parser.add_argument("--since", type=_date, help="only results on/after this date (YYYY-MM-DD)")
+    parser.add_argument("--until", type=_date, help="only results before this date (YYYY-MM-DD)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="rows per row group / chunk")
+    args = parser.parse_args(argv)
+
+    cols = columns()
+    batches = iter_batches(args.db, args.user, args.test, args.since, args.until, args.batch_size, cols)
+    started = time.perf_counter()
+    written = 0
+
+    def with_progress(batches):
+        nonlocal written
+        for batch in batches:
+            yield batch
+            written += len(batch['result_id'])
+            rate = written / max(time.perf_counter() - started, 1e-9)
+            print(f"\r{written:,} rows ({rate:,.0f} rows/s)", end="", file=sys.stderr, flush=True)
+
+    if args.format == 'csv':
+        out = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8', newline='')
+        try:
+            for chunk in iter_csv(with_progress(batches), cols):
+                out.write(chunk)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+    else:
+        sink = sys.stdout.buffer if args.output == '-' else args.output
+        writer = write_parquet if args.format == 'parquet' else write_arrow
+        writer(sink, with_progress(batches), cols)
+    print(f"\nExported {written:,} rows in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+# Bulk scoring of submissions collected outside the app (paper forms,
+# Google Forms exports). Input is read one chunk at a time and each chunk is
+# scored on a process pool with the same validators and scorers as the app
+# and API (submissions.py), so thresholds and numbers never diverge. Results
+# are written in input order; at most a few chunks are held in memory.
+#
+#   python import_submissions.py stress_forms.csv --test stress --output scored.csv
+#   python import_submissions.py clinic.jsonl --output scored.jsonl
+#
+# JSONL input: one submission per line, shaped like the API bodies, with a
+# "type" field unless --test is given. CSV input: one submission per row;
+# answers come from an "answers" column (a JSON list or values separated by
+# ";"), from columns q1..qN, or from columns headed with the question text
+# (as in a Google Forms export). Answers may be option labels or numbers.
+
+import argparse
+import collections
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from question_bank import iq_bank, stress_bank
+from submissions import SubmissionError, TEST_TYPES, score_submission
+
+CHUNK_SIZE = 2000
+# Chunks queued per worker; bounds memory however large the input is
+CHUNKS_IN_FLIGHT = 2
+
+# Passed through from the input so output rows can be matched up
+ID_FIELDS = ('id', 'user_id')
+
+# Scalar result fields written to CSV output, per test type
+OUTPUT_FIELDS = {
+    'iq': ('correct_count', 'total', 'score_percentage', 'iq_estimate'),
+    'bmi': ('bmi', 'category', 'health_status', 'priority', 'weight_goal', 'bmr',
+            'daily_calories', 'target_calories', 'protein_g', 'carbs_g', 'fats_g', 'water_l'),
+    'stress': ('total_score', 'max_score', 'stress_percentage', 'level', 'risk'),
+}
+
+
+def _banks():
+    return {'iq': iq_bank(), 'stress': stress_bank()}
+
+
+def _normalize(text):
+    return ' '.join(str(text).split()).casefold()
+
+
+class CsvAnswers:
+    """Finds the answer columns of a CSV header for each question bank."""
+
+    def __init__(self, fieldnames):
+        self.fieldnames = fieldnames or []
+        self._columns = {}
+
+    def columns(self, test_type, bank):
+        if test_type not in self._columns:
+            by_text = {_normalize(name): name for name in self.fieldnames}
+            numbered = [f"q{i}" for i in range(1, len(bank) + 1)]
+            if all(name in self.fieldnames for name in numbered):
+                self._columns[test_type] = numbered
+            elif all(_normalize(q.question) in by_text for q in bank):
+                self._columns[test_type] = [by_text[_normalize(q.question)] for q in bank]
+            else:
+                self._columns[test_type] = None
+        return self._columns[test_type]
+
+    def submission(self, row, test_type, banks):
+        # csv.DictReader fills the columns a short row lacks with None
+        missing = [key for key, value in row.items() if key is not None and value is None]
+        if missing:
+            raise SubmissionError(f"Row has no value for {', '.join(missing)}")
+        submission = {key: value for key, value in row.items() if key is not None}
+        answers = submission.get('answers')
+        if answers:
+            try:
+                answers = json.loads(answers)
+            except ValueError:
+                answers = [answer.strip() for answer in answers.split(';')]
+            submission['answers'] = answers
+        elif test_type in banks:
+            columns = self.columns(test_type, banks[test_type])
+            if columns is not None:
+                submission['answers'] = [row[name].strip() for name in columns]
+        return submission
+
+
+def read_submissions(path, test_type=None):
+    """Yield (row number, test type, submission, error); row numbers count from 1.
+
+    error is None, or why the row could not be read; submission then holds
+    only the row's ID_FIELDS, so the rejection can still be matched up.
+    """
+    opener = sys.stdin if path == '-' else open(path, encoding='utf-8-sig', newline='')
+    try:
+        if path.endswith('.csv'):
+            reader = csv.DictReader(opener)
+            answers = CsvAnswers(reader.fieldnames)
+            banks = _banks()
+            for number, row in enumerate(reader, 1):
+                kind = test_type or (row.get('type') or '').strip()
+                try:
+                    submission, error = answers.submission(row, kind, banks), None
+                except SubmissionError as exc:
+                    # Reported with the row's result like any other invalid submission
+                    submission = {field: row[field] for field in ID_FIELDS if row.get(field) is not None}
+                    error = str(exc)
+                yield number, kind, submission, error
+        else:
+            for number, line in enumerate(opener, 1):
+                if not line.strip():
+                    continue
+                try:
+                    submission, error = json.loads(line), None
+                except ValueError:
+                    submission, error = None, "Line is not valid JSON"
+                kind = test_type or (submission.get('type') if isinstance(submission, dict) else None)
+                yield number, kind, submission, error
+    finally:
+        if opener is not sys.stdin:
+            opener.close()
+
+
+def chunked(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def score_chunk(chunk):
+    """Score one chunk in a worker: [{'row', 'type', 'ok', 'result' | 'error', ...ids}]"""
+    scored = []
+    for number, test_type, submission, error in chunk:
+        record = {'row': number, 'type': test_type}
+        if isinstance(submission, dict):
+            record.update((field, submission[field]) for field in ID_FIELDS if field in submission)
+        try:
+            if error is not None:
+                raise SubmissionError(error)
+            record['result'] = score_submission(test_type, submission)
+            record['ok'] = True
+        except SubmissionError as exc:
+            record['ok'] = False
+            record['error'] = str(exc)
+        scored.append(record)
+    return scored
+
+
+def score_stream(submissions, processes=None, chunk_size=CHUNK_SIZE):
+    """Yield scored chunks in input order, scoring on a process pool.
+
+    Only processes * CHUNKS_IN_FLIGHT chunks are read ahead, unlike
+    Pool.imap, which consumes its whole input up front.
+    """
+    processes = processes or os.cpu_count() or 1
+    chunks = chunked(submissions, chunk_size)
+    if processes == 1:
+        yield from map(score_chunk, chunks)
+        return
+    with multiprocessing.Pool(processes) as pool:
+        pending = collections.deque()
+        for chunk in chunks:
+            pending.append(pool.apply_async(score_chunk, (chunk,)))
+            if len(pending) >= processes * CHUNKS_IN_FLIGHT:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+
+def csv_columns(test_types):
+    """Output columns for CSV: ids, status, then result fields and category breakdowns."""
+    banks = _banks()
+    columns = ['row', *ID_FIELDS, 'type', 'ok', 'error']
+    for test_type in test_types:
+        columns += OUTPUT_FIELDS[test_type]
+        if test_type == 'iq':
+            for category in banks['iq'].categories:
+                columns += [f"{category} correct", f"{category} total"]
+        elif test_type == 'stress':
+            for category in banks['stress'].categories:
+                columns += [f"{category} avg", f"{category} %"]
+    # Shared field names (none today) would otherwise be listed twice
+    return list(dict.fromkeys(columns))
+
+
+def csv_row(record):
+    row = {key: value for key, value in record.items() if key != 'result'}
+    result = record.get('result')
+    if result is None:
+        return row
+    row.update((field, result.get(field)) for field in OUTPUT_FIELDS[record['type']])
+    for category, scores in (result.get('category_scores') or {}).items():
+        if record['type'] == 'iq':
+            row[f"{category} correct"] = scores['correct']
+            row[f"{category} total"] = scores['total']
+        else:
+            row[f"{category} avg"] = scores['average']
+            row[f"{category} %"] = scores['percentage']
+    return row
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a CSV/JSONL file of submissions")
+    parser.add_argument("input", help="submissions (.csv or .jsonl; '-' reads JSONL from stdin)")
+    parser.add_argument("--output", required=True, help="results (.csv or .jsonl; '-' writes JSONL to stdout)")
+    parser.add_argument("--test", choices=TEST_TYPES, help="test type of every submission (else the 'type' field)")
+    parser.add_argument("--processes", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="submissions per chunk")
+    args = parser.parse_args(argv)
+
+    as_csv = args.output.endswith('.csv')
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8', newline='')
+    if as_csv:
+        writer = csv.DictWriter(out, csv_columns([args.test] if args.test else TEST_TYPES),
+                                extrasaction='ignore')
+        writer.writeheader()
+
+    started = time.perf_counter()
+    scored = failed = 0
+    try:
+        submissions = read_submissions(args.input, args.test)
+        for chunk in score_stream(submissions, args.processes, args.chunk_size):
+            for record in chunk:
+                if as_csv:
+                    writer.writerow(csv_row(record))
+                else:
+                    out.write(json.dumps(record, ensure_ascii=False) + '\n')
+                failed += not record['ok']
+            scored += len(chunk)
+            rate = scored / max(time.perf_counter() - started, 1e-9)
+            print(f"\r{scored:,} scored, {failed:,} rejected ({rate:,.0f}/s)", end="", file=sys.stderr, flush=True)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"\nScored {scored:,} submissions in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
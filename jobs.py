@@ -0,0 +1,86 @@
+# Results computation off the script thread.
+# A ResultsJob scores a submission and then builds each results section on a
+# shared thread pool, reporting each piece as it finishes so the page can
+# fill in its placeholders progressively. Cancelling a job skips every step
+# that has not started yet; steps already running finish and are discarded.
+#
+#     job = ResultsJob(pool, lambda: score_stress(answers, bank), {'plan': make_plan})
+#     for event in job.events():
+#         ...  # None while waiting, else (key, value); key is RESULT for the score
+
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Threads rather than processes: steps are short, share the (already
+# loaded) rule engines and question banks, and will mostly wait on I/O
+# (storage, model calls) as results pages grow.
+POOL_WORKERS = min(8, (os.cpu_count() or 1) + 4)
+# Seconds between idle events while waiting for the next step
+POLL_INTERVAL = 0.1
+
+RESULT = 'result'
+
+
+def make_pool(workers=POOL_WORKERS):
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="results")
+
+
+class ResultsJob:
+    """score() -> result, then each of sections {key: fn(result) -> value}."""
+
+    def __init__(self, pool, score, sections=None):
+        self.pool = pool
+        self.score = score
+        self.sections = dict(sections or {})
+        self._events = queue.Queue()
+        self._cancelled = threading.Event()
+        self._remaining = 1 + len(self.sections)
+        pool.submit(self._run, RESULT, score)
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    @property
+    def done(self):
+        return self._remaining == 0
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def _run(self, key, fn, *args):
+        if self._cancelled.is_set():
+            return
+        try:
+            value = fn(*args)
+        except BaseException as exc:
+            self._events.put((key, None, exc))
+            return
+        self._events.put((key, value, None))
+        if key == RESULT:
+            # Sections only need the result, so they run side by side
+            for section, section_fn in self.sections.items():
+                if self._cancelled.is_set():
+                    return
+                self.pool.submit(self._run, section, section_fn, value)
+
+    def events(self, poll=POLL_INTERVAL):
+        """Yield (key, value) as steps finish, and None every `poll` seconds while waiting.
+
+        The idle events let the caller keep its UI (and, in Streamlit, the
+        script's interrupt checks) alive. A failed step re-raises its
+        exception here; nothing more is yielded once the job is cancelled.
+        """
+        while self._remaining and not self._cancelled.is_set():
+            try:
+                key, value, error = self._events.get(timeout=poll)
+            except queue.Empty:
+                yield None
+                continue
+            self._remaining -= 1
+            if error is not None:
+                self.cancel()
+                raise error
+            yield key, value
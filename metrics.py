@@ -0,0 +1,278 @@
+# In-process rerun metrics in OpenMetrics text format.
+# Enabled with MINDBODY_METRICS=1. Timing spans around page sections,
+# scoring and recommendation selection feed per-(page, section) latency
+# histograms; every rerun also counts its page and the elements it sent.
+# Other modules can add gauges and counters read at scrape time (see collect).
+# The exposition is served at http://127.0.0.1:$MINDBODY_METRICS_PORT/metrics
+# (default 9464, 0 disables the endpoint) and, if MINDBODY_METRICS_FILE is
+# set, rewritten to that file every FILE_INTERVAL seconds.
+#
+# When disabled, span() returns one shared no-op context manager and
+# nothing else runs, so the instrumentation can stay in the hot path.
+
+import contextlib
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+
+ENABLED = os.environ.get("MINDBODY_METRICS", "") not in ("", "0")
+PORT = int(os.environ.get("MINDBODY_METRICS_PORT", "9464"))
+FILE = os.environ.get("MINDBODY_METRICS_FILE")
+FILE_INTERVAL = 15
+
+# Histogram bucket upper bounds
+SECONDS_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+ELEMENT_BUCKETS = (10, 25, 50, 100, 200, 400, 800, 1600)
+# Sessions kept in the per-session element gauge (most recently active)
+MAX_SESSION_SERIES = 500
+
+METRICS = {
+    # name: (type, unit, help)
+    'mindbody_section_seconds': ('histogram', 'seconds', "Time spent in a section of a script run"),
+    'mindbody_reruns': ('counter', '', "Script runs per page"),
+    'mindbody_rerun_elements': ('histogram', '', "Elements (deltas) sent by one script run"),
+    'mindbody_session_elements': ('gauge', '', "Elements sent by a session's latest script run"),
+    # Session state write-through and spilling (session_state.SessionSpill)
+    'mindbody_session_state_sessions': ('gauge', '', "Sessions whose state is resident, stored or waiting to be written"),
+    'mindbody_session_state_bytes': ('gauge', 'bytes', "Size of resident and stored session state"),
+    'mindbody_session_state_events': ('counter', '', "Session state spills, restores, expiries and writes"),
+    'mindbody_session_state_written_bytes': ('counter', 'bytes', "Session state bytes written to the backend"),
+}
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'sum')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class Registry:
+    """Thread-safe store of labelled histograms, counters and gauges."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}  # (name, labels) -> Histogram
+        self._counters = {}    # (name, labels) -> int
+        self._gauges = OrderedDict()  # (name, labels) -> value, oldest first
+        self._collectors = []
+
+    def observe(self, name, labels, value, buckets=SECONDS_BUCKETS):
+        with self._lock:
+            histogram = self._histograms.get((name, labels))
+            if histogram is None:
+                histogram = self._histograms[(name, labels)] = Histogram(buckets)
+            histogram.observe(value)
+
+    def inc(self, name, labels, amount=1):
+        with self._lock:
+            self._counters[(name, labels)] = self._counters.get((name, labels), 0) + amount
+
+    def set(self, name, labels, value, max_series=MAX_SESSION_SERIES):
+        with self._lock:
+            self._gauges[(name, labels)] = value
+            self._gauges.move_to_end((name, labels))
+            while len(self._gauges) > max_series:
+                self._gauges.popitem(last=False)
+
+    def collect(self, fn):
+        self._collectors.append(fn)
+
+    def render(self):
+        """The OpenMetrics text exposition of everything recorded so far."""
+        with self._lock:
+            histograms = {key: (h.buckets, list(h.counts), h.sum) for key, h in self._histograms.items()}
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            collectors = list(self._collectors)
+        for fn in collectors:
+            try:
+                samples = fn()
+            except Exception:
+                # e.g. the state backend is unreachable; leave its series out of this scrape
+                continue
+            for name, labels, value in samples:
+                (counters if METRICS[name][0] == 'counter' else gauges)[(name, labels)] = value
+
+        lines = []
+        for name, (kind, unit, help_text) in METRICS.items():
+            lines.append(f"# TYPE {name} {kind}")
+            if unit:
+                lines.append(f"# UNIT {name} {unit}")
+            lines.append(f"# HELP {name} {help_text}")
+            if kind == 'histogram':
+                for (metric, labels), (buckets, counts, total) in sorted(histograms.items()):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(buckets + (float('inf'),), counts):
+                        cumulative += count
+                        le = '+Inf' if bound == float('inf') else repr(float(bound))
+                        lines.append(f"{name}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+                    lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+                    lines.append(f"{name}_sum{_labels(labels)} {total!r}")
+            elif kind == 'counter':
+                lines += [f"{name}_total{_labels(labels)} {value}"
+                          for (metric, labels), value in sorted(counters.items()) if metric == name]
+            else:
+                lines += [f"{name}{_labels(labels)} {value}"
+                          for (metric, labels), value in sorted(gauges.items()) if metric == name]
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in labels)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + "}"
+
+
+registry = Registry()
+
+
+class _Span:
+    __slots__ = ('labels', 'started')
+
+    def __init__(self, page, section):
+        self.labels = (('page', page), ('section', section))
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        # Interrupted or failed blocks would skew the timings
+        if exc_type is None:
+            registry.observe('mindbody_section_seconds', self.labels, time.perf_counter() - self.started)
+        return False
+
+
+_NO_SPAN = contextlib.nullcontext()
+
+
+def span(page, section):
+    """Time a block as one observation of (page, section)."""
+    return _Span(page, section) if ENABLED else _NO_SPAN
+
+
+def timed(page, section, fn):
+    """fn wrapped in a span, for work handed to another thread."""
+    if not ENABLED:
+        return fn
+
+    def run(*args, **kwargs):
+        with _Span(page, section):
+            return fn(*args, **kwargs)
+    return run
+
+
+class _ElementCounter:
+    # Wraps a script run context's enqueue to count the deltas it sends
+    def __init__(self, enqueue):
+        self.enqueue = enqueue
+        self.count = 0
+
+    def __call__(self, msg):
+        if msg.HasField('delta'):
+            self.count += 1
+        self.enqueue(msg)
+
+
+def collect(fn):
+    """Add fn() -> [(name, labels, value)], called at each scrape, for gauges and counters in METRICS."""
+    if ENABLED:
+        registry.collect(fn)
+
+
+def start_run():
+    """Start counting this script run's elements; returns a token for finish_run."""
+    if not ENABLED:
+        return None
+    _serve()
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return None
+    if not isinstance(ctx._enqueue, _ElementCounter):
+        ctx._enqueue = _ElementCounter(ctx._enqueue)
+    ctx._enqueue.count = 0
+    return ctx
+
+
+def finish_run(token, page, sections=()):
+    """Record a finished run: its page, element count and [(section, _, duration ms)]."""
+    if token is None:
+        return
+    registry.inc('mindbody_reruns', (('page', page),))
+    for section, _, duration_ms in sections:
+        registry.observe('mindbody_section_seconds', (('page', page), ('section', section)), duration_ms / 1000)
+    elements = token._enqueue.count
+    registry.observe('mindbody_rerun_elements', (('page', page),), elements, ELEMENT_BUCKETS)
+    registry.set('mindbody_session_elements', (('session', token.session_id),), elements)
+
+
+_serving = threading.Lock()
+_started = False
+
+
+def _serve():
+    # Start the endpoint and file writer once per process
+    global _started
+    if _started:
+        return
+    with _serving:
+        if _started:
+            return
+        _started = True
+        if PORT:
+            threading.Thread(target=_http_loop, name="metrics-http", daemon=True).start()
+        if FILE:
+            threading.Thread(target=_file_loop, name="metrics-file", daemon=True).start()
+
+
+def _http_loop():
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = registry.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/openmetrics-text; version=1.0.0; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    try:
+        server = ThreadingHTTPServer(('127.0.0.1', PORT), Handler)
+    except OSError:
+        # Another process (e.g. a second app on this host) has the port
+        return
+    server.serve_forever()
+
+
+def _file_loop():
+    while True:
+        time.sleep(FILE_INTERVAL)
+        write_file(FILE)
+
+
+def write_file(path):
+    temporary = f"{path}.tmp"
+    with open(temporary, 'w', encoding='utf-8') as f:
+        f.write(registry.render())
+    os.replace(temporary, path)
@@ -0,0 +1,53 @@
+# Startup profile for mindbody.py, enabled with MINDBODY_PROFILE=1.
+# Each script run records how long its imports took and when each page
+# section started (its time to first element), logs one summary line to
+# stderr and lists the timings at the bottom of the page. The first run in a
+# process is the cold start; later runs find their imports in sys.modules.
+# The same section marks feed the rerun metrics when those are enabled.
+
+import itertools
+import os
+import sys
+import time
+
+import metrics
+
+ENABLED = os.environ.get("MINDBODY_PROFILE", "") not in ("", "0")
+# Dependencies that should only load on the pages that need them
+HEAVY_MODULES = ('pandas', 'numpy', 'pyarrow', 'google.generativeai')
+
+_runs = itertools.count()
+
+
+class StartupProfile:
+    """Section start times for one script run (a no-op unless profiling or metrics are on)."""
+
+    def __init__(self, started, log=ENABLED):
+        self.log = log
+        self.enabled = log or metrics.ENABLED
+        self.started = started
+        self.cold = next(_runs) == 0
+        self.marks = [('imports', 0.0)]
+
+    def section(self, name):
+        # Call as a section starts emitting elements
+        if self.enabled:
+            self.marks.append((name, time.perf_counter() - self.started))
+
+    def finish(self):
+        """[(section, first element at ms, duration ms)], logged to stderr when profiling."""
+        if not self.enabled:
+            return []
+        total = time.perf_counter() - self.started
+        ends = [offset for _, offset in self.marks[1:]] + [total]
+        rows = [(name, offset * 1000, (end - offset) * 1000) for (name, offset), end in zip(self.marks, ends)]
+        if not self.log:
+            return rows
+        loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+        print(
+            f"startup profile ({'cold' if self.cold else 'warm'}, {total * 1000:.0f} ms): "
+            + " | ".join(f"{name} @{start:.0f} +{duration:.0f}" for name, start, duration in rows)
+            + f" | loaded: {', '.join(loaded) or 'none'}",
+            file=sys.stderr,
+        )
+        return rows
@@ -0,0 +1,139 @@
+# Question banks loaded from data files (JSON, YAML or Parquet).
+# Each file is parsed once into an immutable QuestionBank indexed by category
+# and level (difficulty for IQ items, impact for stress items). The parsed
+# bank is reused across reruns and sessions and only re-read when the file's
+# modification time changes, so questions can be edited without a redeploy.
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import MISSING, dataclass, fields
+
+from catalog import IQQuestion, StressQuestion
+
+DATA_DIR = os.environ.get(
+    "MINDBODY_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+)
+IQ_BANK_PATH = os.path.join(DATA_DIR, "iq_questions.json")
+STRESS_BANK_PATH = os.path.join(DATA_DIR, "stress_questions.json")
+
+# How often (seconds) a cached bank re-checks its file's mtime
+CHECK_INTERVAL = 1.0
+
+
+@dataclass(frozen=True, slots=True)
+class QuestionBank:
+    items: tuple
+    by_category: dict   # category -> tuple of item positions
+    by_level: dict      # difficulty/impact -> tuple of item positions
+    by_pair: dict       # (category, level) -> tuple of item positions
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __getitem__(self, i):
+        return self.items[i]
+
+    @property
+    def categories(self):
+        return tuple(self.by_category)
+
+    def select(self, category=None, level=None):
+        """Return the items matching a category and/or level."""
+        if category is not None and level is not None:
+            positions = self.by_pair.get((category, level), ())
+        elif category is not None:
+            positions = self.by_category.get(category, ())
+        elif level is not None:
+            positions = self.by_level.get(level, ())
+        else:
+            return self.items
+        return tuple(self.items[i] for i in positions)
+
+
+def _read_records(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".json":
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    if extension in (".yaml", ".yml"):
+        import yaml
+        with open(path, encoding="utf-8") as f:
+            return yaml.safe_load(f)
+    if extension == ".parquet":
+        import pandas as pd
+        return pd.read_parquet(path).to_dict(orient="records")
+    raise ValueError(f"Unsupported question bank format: {path}")
+
+
+def _build(records, item_type, level_field, path):
+    names = {field.name for field in fields(item_type)}
+    required = {field.name for field in fields(item_type)
+                if field.default is MISSING and field.default_factory is MISSING}
+
+    items = []
+    for position, record in enumerate(records):
+        missing = required - set(record)
+        if missing:
+            raise ValueError(f"{path}: item {position} is missing {', '.join(sorted(missing))}")
+        values = {key: value for key, value in record.items() if key in names}
+        if 'options' in values:
+            values['options'] = tuple(values['options'])
+        if 'id' in names and not values.get('id'):
+            values['id'] = hashlib.sha1(values['question'].encode('utf-8')).hexdigest()[:12]
+        items.append(item_type(**values))
+
+    by_category, by_level, by_pair = {}, {}, {}
+    for position, item in enumerate(items):
+        level = getattr(item, level_field)
+        by_category.setdefault(item.category, []).append(position)
+        by_level.setdefault(level, []).append(position)
+        by_pair.setdefault((item.category, level), []).append(position)
+
+    freeze = lambda index: {key: tuple(positions) for key, positions in index.items()}
+    return QuestionBank(tuple(items), freeze(by_category), freeze(by_level), freeze(by_pair))
+
+
+class FileCache:
+    # One parsed object per file, swapped atomically when the mtime changes.
+    # build(records, path) turns the file's records into the cached object.
+
+    def __init__(self, build):
+        self.build = build
+        self._lock = threading.Lock()
+        self._entries = {}  # path -> (mtime_ns, checked_at, value)
+
+    def get(self, path):
+        entry = self._entries.get(path)
+        now = time.monotonic()
+        if entry is not None and now - entry[1] < CHECK_INTERVAL:
+            return entry[2]
+
+        with self._lock:
+            mtime = os.stat(path).st_mtime_ns
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == mtime:
+                value = entry[2]
+            else:
+                value = self.build(_read_records(path), path)
+            self._entries[path] = (mtime, now, value)
+            return value
+
+
+_iq_banks = FileCache(lambda records, path: _build(records, IQQuestion, "difficulty", path))
+_stress_banks = FileCache(lambda records, path: _build(records, StressQuestion, "impact", path))
+
+
+def iq_bank(path=None):
+    """The IQ question bank (reloaded only when its file changes)."""
+    return _iq_banks.get(path or IQ_BANK_PATH)
+
+
+def stress_bank(path=None):
+    """The stress question bank (reloaded only when its file changes)."""
+    return _stress_banks.get(path or STRESS_BANK_PATH)
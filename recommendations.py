@@ -0,0 +1,253 @@
+# Rule-table recommendation engine.
+# Recommendations live in data/recommendations.json, each with declarative
+# conditions over result fields ("when": [[field, op, value], ...]). The
+# table is compiled once per test into an indexed matcher: every rule is
+# filed under one anchor condition (an exact value, a list member or a
+# numeric range), so matching a result looks up the few candidate rules in
+# hash tables / a bisected range table and only checks their remaining
+# conditions. Adding rules does not slow down rules that cannot match.
+#
+# The matcher works on plain dicts, so batch jobs can use it on scored rows:
+#
+#     match('stress', score_stress(answers, bank))
+#     -> ('stress_sleep_quality', 'stress_daily_toolkit', ...)
+
+import os
+from bisect import bisect_left
+from dataclasses import dataclass
+from functools import lru_cache
+
+from question_bank import DATA_DIR, FileCache
+
+RULES_PATH = os.path.join(DATA_DIR, "recommendations.json")
+
+NUMERIC_OPS = {
+    'lt': lambda x, v: x < v,
+    'lte': lambda x, v: x <= v,
+    'gt': lambda x, v: x > v,
+    'gte': lambda x, v: x >= v,
+}
+OPS = {
+    **NUMERIC_OPS,
+    'eq': lambda x, v: x == v,
+    'contains': lambda x, v: x is not None and v in x,
+    'not_contains': lambda x, v: x is None or v not in x,
+    'nonempty': lambda x, v: bool(x) == v,
+}
+STYLES = ('improvement-card', 'warning-card', 'list', 'meals')
+
+# Distinct results pages kept pre-rendered (see results_sections)
+RESULTS_CACHE_SIZE = 512
+
+
+@dataclass(frozen=True, slots=True)
+class Recommendation:
+    id: str
+    test: str
+    section: str
+    style: str
+    when: tuple
+    items: tuple = ()
+    title: str = None
+    heading: str = 'h4'
+    text: str = None
+    # Optional list field of the result; items are then templates filled
+    # in once per value ("Leverage your {} skills", ...)
+    each: str = None
+
+    def to_markdown(self, facts=None):
+        """Markdown/HTML block for this recommendation."""
+        items = self.items
+        if self.each:
+            items = tuple(item.format(value) for value in (facts or {}).get(self.each, ()) for item in items)
+        if self.style == 'list':
+            return '\n'.join(f'- {item}' for item in items)
+        if self.style == 'meals':
+            cells = ''.join(f'<div><strong>{meal}:</strong><p>{suggestion}</p></div>' for meal, suggestion in items)
+            return f'<div class="meal-grid">{cells}</div>'
+        parts = [f'<div class="{self.style}">']
+        if self.title:
+            parts.append(f'<{self.heading}>{self.title}</{self.heading}>')
+        if self.text:
+            parts.append(f'<p>{self.text}</p>')
+        if items:
+            parts.append('<ul>' + ''.join(f'<li>{item}</li>' for item in items) + '</ul>')
+        parts.append('</div>')
+        return '\n'.join(parts)
+
+
+def _check(field, op, value):
+    test = OPS[op]
+    if op in NUMERIC_OPS:
+        return lambda facts: (x := facts.get(field)) is not None and test(x, value)
+    return lambda facts: test(facts.get(field), value)
+
+
+class _RangeIndex:
+    # Numeric conditions on one field, split at their breakpoints into
+    # 2k+1 segments (below, at and between the k sorted values); each
+    # segment stores the rules whose conditions hold anywhere inside it
+
+    def __init__(self, rules):
+        # rules: [(position, [(op, value), ...])]
+        self.points = sorted({value for _, conditions in rules for _, value in conditions})
+        samples = []
+        for i, point in enumerate(self.points):
+            below = self.points[i - 1] if i else point - 1
+            samples += [(below + point) / 2, point]
+        samples.append(self.points[-1] + 1)
+        self.segments = tuple(
+            tuple(position for position, conditions in rules
+                  if all(NUMERIC_OPS[op](x, value) for op, value in conditions))
+            for x in samples
+        )
+
+    def lookup(self, x):
+        i = bisect_left(self.points, x)
+        if i < len(self.points) and self.points[i] == x:
+            return self.segments[2 * i + 1]
+        return self.segments[2 * i]
+
+
+class RuleEngine:
+    """Indexed matcher over the rules of one test."""
+
+    def __init__(self, rules):
+        self.rules = tuple(rules)
+        self.always = []
+        self.exact = {}      # field -> value -> [positions]
+        self.members = {}    # field -> member -> [positions]
+        ranges = {}          # field -> [(position, [(op, value)])]
+        self.residual = {}   # position -> (check, ...)
+
+        for position, rule in enumerate(self.rules):
+            conditions = list(rule.when)
+            anchor = next((c for c in conditions if c[1] == 'eq'), None) \
+                or next((c for c in conditions if c[1] == 'contains'), None)
+            if anchor is not None:
+                conditions.remove(anchor)
+                field, op, value = anchor
+                table = self.exact if op == 'eq' else self.members
+                table.setdefault(field, {}).setdefault(value, []).append(position)
+            else:
+                numeric = next((c for c in conditions if c[1] in NUMERIC_OPS), None)
+                if numeric is None:
+                    self.always.append(position)
+                else:
+                    # Fold every numeric condition on the anchor field into the range table
+                    folded = [c for c in conditions if c[0] == numeric[0] and c[1] in NUMERIC_OPS]
+                    conditions = [c for c in conditions if c not in folded]
+                    ranges.setdefault(numeric[0], []).append(
+                        (position, [(op, value) for _, op, value in folded]))
+            if conditions:
+                self.residual[position] = tuple(_check(*c) for c in conditions)
+
+        self.ranges = {field: _RangeIndex(entries) for field, entries in ranges.items()}
+
+    def match(self, facts):
+        """Positions of the rules matching facts, in table order."""
+        candidates = list(self.always)
+        for field, table in self.exact.items():
+            value = facts.get(field)
+            try:
+                candidates += table.get(value, ())
+            except TypeError:  # unhashable value
+                pass
+        for field, table in self.members.items():
+            for member in facts.get(field) or ():
+                candidates += table.get(member, ())
+        for field, index in self.ranges.items():
+            x = facts.get(field)
+            if x is not None:
+                candidates += index.lookup(x)
+
+        residual = self.residual
+        return sorted(
+            position for position in set(candidates)
+            if all(check(facts) for check in residual.get(position, ()))
+        )
+
+
+def _compile(records, path):
+    by_test = {}
+    seen = set()
+    for record in records:
+        rule_id = record.get('id')
+        if rule_id in seen:
+            raise ValueError(f"{path}: duplicate recommendation id {rule_id!r}")
+        seen.add(rule_id)
+        when = tuple(tuple(condition) for condition in record.get('when', ()))
+        for condition in when:
+            if len(condition) != 3 or condition[1] not in OPS:
+                raise ValueError(f"{path}: invalid condition {list(condition)!r} in {rule_id!r}")
+        if record.get('style') not in STYLES:
+            raise ValueError(f"{path}: {rule_id!r} has unknown style {record.get('style')!r}")
+        items = tuple(tuple(item) if isinstance(item, list) else item for item in record.get('items', ()))
+        rec = Recommendation(**{**record, 'when': when, 'items': items})
+        by_test.setdefault(rec.test, []).append(rec)
+    return {test: RuleEngine(rules) for test, rules in by_test.items()}
+
+
+_engines = FileCache(_compile)
+
+
+def engine(test, path=None):
+    """The compiled rule engine for a test (reloaded when the file changes)."""
+    engines = _engines.get(path or RULES_PATH)
+    if test not in engines:
+        raise KeyError(f"No recommendation rules for test {test!r}")
+    return engines[test]
+
+
+def match(test, facts, path=None):
+    """IDs of the recommendations matching a result, in table order."""
+    rule_engine = engine(test, path)
+    return tuple(rule_engine.rules[i].id for i in rule_engine.match(facts))
+
+
+def recommend(test, facts, path=None):
+    """Matching recommendations grouped by section: {section: (Recommendation, ...)}."""
+    rule_engine = engine(test, path)
+    sections = {}
+    for i in rule_engine.match(facts):
+        rec = rule_engine.rules[i]
+        sections.setdefault(rec.section, []).append(rec)
+    return {section: tuple(recs) for section, recs in sections.items()}
+
+
+@lru_cache(maxsize=RESULTS_CACHE_SIZE)
+def _layout_sections(rule_engine, positions, layout, bindings):
+    facts = dict(bindings)
+    sections = {}
+    for i in positions:
+        rec = rule_engine.rules[i]
+        sections.setdefault(rec.section, []).append(rec.to_markdown(facts))
+
+    rendered = []
+    for heading, section, optional in layout:
+        if optional and section not in sections:
+            rendered.append('')
+            continue
+        blocks = [f'### {heading}'] if heading else []
+        rendered.append('\n\n'.join(blocks + sections.get(section, [])))
+    return tuple(rendered)
+
+
+def results_sections(test, facts, layout, path=None):
+    """The recommendations for a result as one markdown/HTML fragment per layout entry.
+
+    layout is a tuple of (heading, section, optional) entries; optional
+    sections (and their heading) are '' when nothing matched. Pages are
+    memoized per distinct outcome - the matched rules plus the values of
+    any templated fields - so repeat outcomes cost one dict lookup.
+    """
+    rule_engine = engine(test, path)
+    positions = tuple(rule_engine.match(facts))
+    fields = sorted({rule_engine.rules[i].each for i in positions} - {None})
+    bindings = tuple((field, tuple(facts.get(field) or ())) for field in fields)
+    return _layout_sections(rule_engine, positions, layout, bindings)
+
+
+def results_markdown(test, facts, layout, path=None):
+    """The recommendations for a result as one markdown/HTML fragment (see results_sections)."""
+    return '\n\n'.join(section for section in results_sections(test, facts, layout, path) if section)
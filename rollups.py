@@ -0,0 +1,241 @@
+# Cohort rollups for the admin dashboard.
+# CohortRollup is a ResultStore write hook that adds each new result to
+# small pre-aggregated tables keyed by day and age band: outcome counts
+# (BMI category, stress level/risk, IQ score band), IQ per-category accuracy
+# and per-question correctness (keyed by question id, so it survives bank
+# edits). Dashboard queries sum a few hundred rollup rows for the chosen
+# filters instead of scanning raw results. Results saved without an age are
+# counted in the "unknown" band.
+
+import datetime
+import json
+from bisect import bisect_right
+from collections import Counter
+
+from question_bank import iq_bank
+from storage import connect
+
+AGE_BANDS = ("13-17", "18-24", "25-34", "35-44", "45-54", "55-64", "65+")
+UNKNOWN_AGE = "unknown"
+# Lower bound of each band above, in order
+_AGE_LOWER = (13, 18, 25, 35, 45, 55, 65)
+
+IQ_SCORE_BANDS = ((90, "<90"), (110, "90-109"), (130, "110-129"), (float('inf'), "130+"))
+
+# Result fields counted per test type, besides the IQ score band
+OUTCOME_FIELDS = {
+    'bmi': ('category',),
+    'stress': ('level', 'risk'),
+}
+
+ROLLUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollup_outcomes (
+    dimension TEXT NOT NULL,
+    test_type TEXT NOT NULL,
+    day TEXT NOT NULL,
+    age_band TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (dimension, test_type, day, age_band, bucket)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollup_iq_categories (
+    day TEXT NOT NULL,
+    age_band TEXT NOT NULL,
+    category TEXT NOT NULL,
+    correct INTEGER NOT NULL,
+    total INTEGER NOT NULL,
+    PRIMARY KEY (day, age_band, category)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollup_iq_items (
+    day TEXT NOT NULL,
+    age_band TEXT NOT NULL,
+    question_id TEXT NOT NULL,
+    correct INTEGER NOT NULL,
+    answered INTEGER NOT NULL,
+    PRIMARY KEY (day, age_band, question_id)
+) WITHOUT ROWID;
+"""
+
+# Rows read per chunk when backfilling from existing results
+BACKFILL_CHUNK = 10000
+
+
+def age_band(age):
+    try:
+        age = int(age)
+    except (TypeError, ValueError):
+        return UNKNOWN_AGE
+    if age < _AGE_LOWER[0]:
+        return UNKNOWN_AGE
+    return AGE_BANDS[bisect_right(_AGE_LOWER, age) - 1]
+
+
+def iq_score_band(score):
+    for upper, name in IQ_SCORE_BANDS:
+        if score < upper:
+            return name
+
+
+class CohortRollup:
+    """ResultStore hook that keeps the rollup tables current."""
+
+    def setup(self, conn):
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'rollup_outcomes'"
+        ).fetchone()
+        # Per-question rows used to be keyed by bank position
+        positional = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'rollup_iq_questions'"
+        ).fetchone()
+        conn.executescript(ROLLUP_SCHEMA)
+        if not exists or positional:
+            # First run against an existing database: roll up saved results
+            conn.execute("DROP TABLE IF EXISTS rollup_iq_questions")
+            cursor = conn.execute("SELECT user_id, test_type, created_at, payload FROM results")
+            while True:
+                rows = cursor.fetchmany(BACKFILL_CHUNK)
+                if not rows:
+                    break
+                if exists:
+                    self._add_items(conn, rows)
+                else:
+                    self(conn, rows)
+
+    def __call__(self, conn, rows):
+        outcomes = Counter()
+        categories = {}  # key -> [correct, total]
+        for _, test_type, created_at, payload in rows:
+            try:
+                result = json.loads(payload)
+            except ValueError:
+                continue
+            day = datetime.date.fromtimestamp(created_at).isoformat()
+            band = age_band(result.get('age'))
+
+            outcomes[('submissions', test_type, day, band, 'all')] += 1
+            for field in OUTCOME_FIELDS.get(test_type, ()):
+                if result.get(field) is not None:
+                    outcomes[(field, test_type, day, band, str(result[field]))] += 1
+
+            if test_type == 'iq':
+                if isinstance(result.get('score'), (int, float)):
+                    outcomes[('score band', test_type, day, band, iq_score_band(result['score']))] += 1
+                for category, scores in (result.get('category_scores') or {}).items():
+                    sums = categories.setdefault((day, band, category), [0, 0])
+                    sums[0] += scores.get('correct', 0)
+                    sums[1] += scores.get('total', 0)
+
+        conn.executemany(
+            """
+            INSERT INTO rollup_outcomes (dimension, test_type, day, age_band, bucket, count)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (dimension, test_type, day, age_band, bucket)
+            DO UPDATE SET count = count + excluded.count
+            """,
+            [key + (count,) for key, count in outcomes.items()],
+        )
+        conn.executemany(
+            """
+            INSERT INTO rollup_iq_categories (day, age_band, category, correct, total)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (day, age_band, category)
+            DO UPDATE SET correct = correct + excluded.correct, total = total + excluded.total
+            """,
+            [key + tuple(sums) for key, sums in categories.items()],
+        )
+        self._add_items(conn, rows)
+
+    def _add_items(self, conn, rows):
+        items = {}  # (day, age band, question id) -> [correct, answered]
+        bank = None
+        for _, test_type, created_at, payload in rows:
+            if test_type != 'iq':
+                continue
+            try:
+                result = json.loads(payload)
+            except ValueError:
+                continue
+            day = datetime.date.fromtimestamp(created_at).isoformat()
+            band = age_band(result.get('age'))
+            for question, correct in result.get('item_results') or ():
+                if isinstance(question, int):
+                    # Saved before results carried ids: the position in the current bank
+                    bank = bank or iq_bank()
+                    if not 0 <= question < len(bank):
+                        continue
+                    question = bank[question].id
+                sums = items.setdefault((day, band, question), [0, 0])
+                sums[0] += int(correct)
+                sums[1] += 1
+        conn.executemany(
+            """
+            INSERT INTO rollup_iq_items (day, age_band, question_id, correct, answered)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (day, age_band, question_id)
+            DO UPDATE SET correct = correct + excluded.correct, answered = answered + excluded.answered
+            """,
+            [key + tuple(sums) for key, sums in items.items()],
+        )
+
+
+def _filters(start=None, end=None, age_bands=None):
+    # WHERE clause over the rollup key columns; dates are ISO day strings
+    clauses, params = [], []
+    if start is not None:
+        clauses.append("day >= ?")
+        params.append(str(start))
+    if end is not None:
+        clauses.append("day <= ?")
+        params.append(str(end))
+    if age_bands:
+        clauses.append(f"age_band IN ({', '.join('?' * len(age_bands))})")
+        params.extend(age_bands)
+    return clauses, params
+
+
+class CohortStats:
+    """Read-side queries over the rollup tables.
+
+    Every method takes the same filters: start/end days (datetime.date or
+    ISO strings, inclusive) and an optional list of age bands.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def _query(self, sql, clauses, params, group_by):
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        conn = connect(self.path)
+        try:
+            return conn.execute(f"{sql} {where} GROUP BY {group_by} ORDER BY {group_by}", params).fetchall()
+        finally:
+            conn.close()
+
+    def outcomes(self, test_type, dimension, start=None, end=None, age_bands=None):
+        """[(bucket, count)] for one outcome of one test type."""
+        clauses, params = _filters(start, end, age_bands)
+        clauses[:0] = ["dimension = ?", "test_type = ?"]
+        params[:0] = [dimension, test_type]
+        return self._query("SELECT bucket, SUM(count) FROM rollup_outcomes", clauses, params, "bucket")
+
+    def daily_submissions(self, start=None, end=None, age_bands=None):
+        """[(day, test_type, count)]"""
+        clauses, params = _filters(start, end, age_bands)
+        clauses.insert(0, "dimension = 'submissions'")
+        return self._query(
+            "SELECT day, test_type, SUM(count) FROM rollup_outcomes", clauses, params, "day, test_type"
+        )
+
+    def iq_categories(self, start=None, end=None, age_bands=None):
+        """[(category, correct, total)]"""
+        clauses, params = _filters(start, end, age_bands)
+        return self._query(
+            "SELECT category, SUM(correct), SUM(total) FROM rollup_iq_categories", clauses, params, "category"
+        )
+
+    def iq_questions(self, start=None, end=None, age_bands=None):
+        """[(question id, correct, answered)]"""
+        clauses, params = _filters(start, end, age_bands)
+        return self._query(
+            "SELECT question_id, SUM(correct), SUM(answered) FROM rollup_iq_items", clauses, params, "question_id"
+        )
@@ -0,0 +1,198 @@
+# Pure-Python scoring engine for the assessment tests.
+# Nothing in here touches Streamlit, so results can be computed (and
+# benchmarked or cached) outside the UI as well as from mindbody.py.
+
+from types import MappingProxyType
+
+# BMI bands: (upper bound, category, color, health status, priority)
+BMI_BANDS = (
+    (16, "Severely Underweight", "red",
+     "⚠️ Serious health risk - Please consult a healthcare provider", "urgent"),
+    (17, "Moderately Underweight", "orange",
+     "⚠️ Health risk - Consider medical consultation", "high"),
+    (18.5, "Mildly Underweight", "yellow",
+     "⚡ Slightly below normal - Monitor closely", "moderate"),
+    (25, "Normal Weight", "green",
+     "✅ Healthy range - Great job!", "maintain"),
+    (30, "Overweight", "orange",
+     "⚠️ Increased health risk - Consider lifestyle changes", "moderate"),
+    (35, "Class I Obesity", "red",
+     "⚠️ High health risk - Recommend medical consultation", "high"),
+    (40, "Class II Obesity", "red",
+     "🚨 Very high health risk - Medical supervision recommended", "urgent"),
+    (float("inf"), "Class III Obesity", "red",
+     "🚨 Extremely high health risk - Immediate medical attention advised", "urgent"),
+)
+
+ACTIVITY_MULTIPLIERS = MappingProxyType({
+    "Sedentary (little/no exercise)": 1.2,
+    "Lightly active (light exercise 1-3 days/week)": 1.375,
+    "Moderately active (moderate exercise 3-5 days/week)": 1.55,
+    "Very active (hard exercise 6-7 days/week)": 1.725,
+    "Extra active (very hard exercise/physical job)": 1.9
+})
+
+GOAL_ADJUSTMENTS = MappingProxyType({
+    "Maintain current weight": 0,
+    "Lose weight gradually": -500,
+    "Lose weight quickly": -750,
+    "Gain weight": +500,
+    "Build muscle": +300,
+    "Improve overall health": 0
+})
+
+# Stress levels: (minimum percentage, level, risk)
+STRESS_LEVELS = (
+    (75, "Very High 🔴", "High Risk"),
+    (50, "High 🟠", "Moderate Risk"),
+    (25, "Moderate 🟡", "Low Risk"),
+    (0, "Low 🟢", "Minimal Risk"),
+)
+
+STRESS_MAX_PER_QUESTION = 4
+
+# IQ categories answered below WEAK_AREA_SHARE correct are weak areas, at or
+# above STRONG_AREA_SHARE strong ones
+WEAK_AREA_SHARE = 0.6
+STRONG_AREA_SHARE = 0.8
+
+
+def score_iq(answers, questions):
+    """Score an IQ submission. `answers` maps question index -> chosen option."""
+    correct_count = 0
+    category_scores = {}
+    item_results = []  # [question id, 1/0] for each answered question
+
+    for i, q in enumerate(questions):
+        category = q.category
+        if category not in category_scores:
+            category_scores[category] = {'correct': 0, 'total': 0}
+
+        category_scores[category]['total'] += 1
+
+        answer = answers.get(i)
+        if answer == q.correct:
+            correct_count += 1
+            category_scores[category]['correct'] += 1
+        if answer is not None:
+            item_results.append([q.id, int(answer == q.correct)])
+
+    score_percentage = (correct_count / len(questions)) * 100
+    iq_estimate = 85 + (score_percentage * 0.3)
+
+    weak_areas = [cat for cat, scores in category_scores.items()
+                  if (scores['correct'] / scores['total']) < WEAK_AREA_SHARE]
+    strong_areas = [cat for cat, scores in category_scores.items()
+                    if (scores['correct'] / scores['total']) >= STRONG_AREA_SHARE]
+
+    return {
+        'correct_count': correct_count,
+        'total': len(questions),
+        'score_percentage': score_percentage,
+        'iq_estimate': iq_estimate,
+        'category_scores': category_scores,
+        'weak_areas': weak_areas,
+        'strong_areas': strong_areas,
+        'item_results': item_results,
+    }
+
+
+def bmi_band(bmi):
+    """Return (category, color, health_status, priority) for a BMI value."""
+    for upper, category, color, health_status, priority in BMI_BANDS:
+        if bmi < upper:
+            return category, color, health_status, priority
+
+
+def score_bmi(height, weight, age, activity_level, health_goal):
+    """Score a BMI submission (height in cm, weight in kg)."""
+    height_m = height / 100
+    bmi = weight / (height_m ** 2)
+    category, color, health_status, priority = bmi_band(bmi)
+
+    # Distance to the normal range (None when already in it)
+    if bmi < 18.5:
+        weight_goal = 18.5 * (height_m ** 2) - weight
+    elif bmi > 25:
+        weight_goal = 22.5 * (height_m ** 2) - weight  # Middle of normal range
+    else:
+        weight_goal = None
+
+    # Calculate daily calorie needs
+    if age <= 30:
+        bmr_factor = 1.0
+    elif age <= 50:
+        bmr_factor = 0.95
+    else:
+        bmr_factor = 0.9
+
+    # Simplified BMR calculation
+    bmr = (10 * weight + 6.25 * height - 5 * age + 5) * bmr_factor
+    daily_calories = bmr * ACTIVITY_MULTIPLIERS[activity_level]
+    target_calories = daily_calories + GOAL_ADJUSTMENTS[health_goal]
+
+    return {
+        'bmi': bmi,
+        'category': category,
+        'color': color,
+        'health_status': health_status,
+        'priority': priority,
+        'weight_goal': weight_goal,
+        'bmr': bmr,
+        'daily_calories': daily_calories,
+        'target_calories': target_calories,
+        'protein_g': target_calories * 0.25 / 4,
+        'carbs_g': target_calories * 0.45 / 4,
+        'fats_g': target_calories * 0.30 / 9,
+        'water_l': weight * 35 / 1000,
+    }
+
+
+def parse_stress_option(answer):
+    """Turn an option label like 'Often (3)' into its numeric score."""
+    return int(answer.split('(')[1].split(')')[0])
+
+
+def stress_level(stress_percentage):
+    """Return (level, risk) for an overall stress percentage."""
+    for minimum, level, risk in STRESS_LEVELS:
+        if stress_percentage >= minimum:
+            return level, risk
+    return STRESS_LEVELS[-1][1], STRESS_LEVELS[-1][2]
+
+
+def score_stress(answers, questions):
+    """Score a stress submission. `answers` maps question index -> 0..4."""
+    total_stress = sum(answers.get(i, 0) for i in range(len(questions)))
+    max_stress = len(questions) * STRESS_MAX_PER_QUESTION
+    stress_percentage = (total_stress / max_stress) * 100
+    level, risk = stress_level(stress_percentage)
+
+    # Calculate category-specific scores
+    category_scores = {}
+    for i, q in enumerate(questions):
+        category = q.category
+        if category not in category_scores:
+            category_scores[category] = {'total': 0, 'count': 0, 'questions': []}
+
+        category_scores[category]['total'] += answers.get(i, 0)
+        category_scores[category]['count'] += 1
+        category_scores[category]['questions'].append(q.question)
+
+    high_stress_categories = []
+    for category, scores in category_scores.items():
+        avg_score = scores['total'] / scores['count']
+        scores['average'] = avg_score
+        scores['percentage'] = (avg_score / STRESS_MAX_PER_QUESTION) * 100
+        if scores['percentage'] >= 60:
+            high_stress_categories.append(category)
+
+    return {
+        'total_score': total_stress,
+        'max_score': max_stress,
+        'stress_percentage': stress_percentage,
+        'level': level,
+        'risk': risk,
+        'category_scores': category_scores,
+        'high_stress_categories': high_stress_categories,
+    }
@@ -0,0 +1,190 @@
+# Retrieval over the app's guidance (the recommendation table in
+# data/recommendations.json): every recommendation line becomes a passage,
+# indexed with BM25 for the "Search tips" box and the chatbot.
+#
+# The index is built offline whenever the rules change:
+#
+#   python search_index.py
+#
+# It is stored as term-major postings in .npy files (offsets, passage ids,
+# precomputed BM25 weights) that are memory-mapped on first search. A query
+# adds up one contiguous slice per query term and picks the top k with
+# argpartition, so search time depends on the query, not the corpus size.
+# Without index files, or when they are older than the rules, the index is
+# built in memory from the rules instead.
+
+import hashlib
+import json
+import os
+import re
+import warnings
+from dataclasses import dataclass
+
+import numpy as np
+
+from question_bank import DATA_DIR, FileCache
+from recommendations import RULES_PATH
+
+INDEX_DIR = os.path.join(DATA_DIR, "search_index")
+INDEX_PATH = os.path.join(INDEX_DIR, "index.json")
+ARRAYS = ('offsets', 'passages', 'weights')
+
+# BM25 parameters
+K1 = 1.5
+B = 0.75
+
+STOPWORDS = frozenset("""
+a an and are as at be by can do does for from get has have how i if in into is it its me my of on or
+should so that the their then this to too up use what when why with you your
+""".split())
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_TAG = re.compile(r"<[^>]+>")
+
+
+def _stem(token):
+    # Light suffix stripping, enough for "sleeping"/"sleeps" to match "sleep"
+    for suffix in ('ing', 'ies', 's'):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3 and not token.endswith('ss'):
+            return token[:-len(suffix)] + ('y' if suffix == 'ies' else '')
+    return token
+
+
+def tokenize(text):
+    return [_stem(token) for token in _TOKEN.findall(_TAG.sub(' ', text).lower()) if token not in STOPWORDS]
+
+
+@dataclass(frozen=True, slots=True)
+class Passage:
+    text: str      # markdown
+    title: str
+    test: str
+    section: str
+    rule_id: str
+
+
+def corpus(records):
+    """Passages from the recommendation records, one per distinct line."""
+    passages, seen = [], set()
+    for record in records:
+        title = (record.get('title') or record['section'].capitalize()).rstrip(':')
+        lines = [record['text']] if record.get('text') else []
+        if not record.get('each'):
+            # Templated items ("Leverage your {} skills") only make sense filled in
+            lines += [': '.join(item) if isinstance(item, list) else item for item in record.get('items', ())]
+        for line in lines:
+            text = re.sub(r'</?strong>', '**', line)
+            if text not in seen:
+                seen.add(text)
+                passages.append(Passage(text, title, record['test'], record['section'], record['id']))
+    return passages
+
+
+class SearchIndex:
+    """BM25 over passages, as term-major postings (see the module comment)."""
+
+    def __init__(self, passages, vocabulary, offsets, passage_ids, weights, source=None):
+        self.passages = passages
+        self.terms = {term: i for i, term in enumerate(vocabulary)}
+        self.offsets = offsets
+        self.passage_ids = passage_ids
+        self.weights = weights
+        self.source = source
+        self._tests = np.array([passage.test for passage in passages])
+
+    @classmethod
+    def build(cls, passages, source=None):
+        docs = [tokenize(f"{p.title} {p.text}") for p in passages]
+        average_length = sum(map(len, docs)) / max(len(docs), 1)
+        postings = {}  # term -> {passage: term frequency}
+        for i, doc in enumerate(docs):
+            for token in doc:
+                counts = postings.setdefault(token, {})
+                counts[i] = counts.get(i, 0) + 1
+
+        vocabulary = sorted(postings)
+        offsets = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        passage_ids, weights = [], []
+        for t, term in enumerate(vocabulary):
+            counts = postings[term]
+            idf = np.log(1 + (len(docs) - len(counts) + 0.5) / (len(counts) + 0.5))
+            for i, tf in sorted(counts.items()):
+                norm = K1 * (1 - B + B * len(docs[i]) / average_length)
+                passage_ids.append(i)
+                weights.append(idf * tf * (K1 + 1) / (tf + norm))
+            offsets[t + 1] = len(passage_ids)
+        return cls(passages, vocabulary, offsets, np.array(passage_ids, dtype=np.int32),
+                   np.array(weights, dtype=np.float32), source)
+
+    def save(self, directory=INDEX_DIR):
+        os.makedirs(directory, exist_ok=True)
+        for name, array in zip(ARRAYS, (self.offsets, self.passage_ids, self.weights)):
+            np.save(os.path.join(directory, f"{name}.npy"), array)
+        meta = {
+            'source': self.source,
+            'k1': K1,
+            'b': B,
+            'vocabulary': sorted(self.terms, key=self.terms.get),
+            'passages': [[p.text, p.title, p.test, p.section, p.rule_id] for p in self.passages],
+        }
+        with open(os.path.join(directory, "index.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+    def search(self, query, k=5, test=None):
+        """The k best passages for a query as [(score, Passage)], best first."""
+        scores = np.zeros(len(self.passages), dtype=np.float32)
+        for token in set(tokenize(query)):
+            t = self.terms.get(token)
+            if t is not None:
+                start, end = self.offsets[t], self.offsets[t + 1]
+                scores[self.passage_ids[start:end]] += self.weights[start:end]
+        if test is not None:
+            scores[self._tests != test] = 0
+        k = min(k, int(np.count_nonzero(scores)))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(float(scores[i]), self.passages[i]) for i in top]
+
+
+def _digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _load(meta, path):
+    directory = os.path.dirname(path)
+    arrays = [np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r') for name in ARRAYS]
+    passages = [Passage(*passage) for passage in meta['passages']]
+    return SearchIndex(passages, meta['vocabulary'], *arrays, source=meta['source'])
+
+
+# Each cache follows one file's mtime; index() checks the saved index
+# against the current rules on every call, so editing either file is seen
+_indexes = FileCache(_load)
+_built = FileCache(lambda records, path: SearchIndex.build(corpus(records), _digest(path)))
+_rules_digests = FileCache(lambda records, path: _digest(path))
+
+
+def index(path=None):
+    """The search index (loaded on first use, and again when its files or the rules change)."""
+    path = path or INDEX_PATH
+    if os.path.exists(path):
+        saved = _indexes.get(path)
+        if saved.source == _rules_digests.get(RULES_PATH):
+            return saved
+        warnings.warn(f"{path} is older than {RULES_PATH}; run `python search_index.py` to rebuild it")
+    return _built.get(RULES_PATH)
+
+
+def search(query, k=5, test=None):
+    """The k best guidance passages for a query, optionally for one test."""
+    return index().search(query, k, test)
+
+
+if __name__ == "__main__":
+    with open(RULES_PATH, encoding="utf-8") as f:
+        built = SearchIndex.build(corpus(json.load(f)), _digest(RULES_PATH))
+    built.save()
+    print(f"Indexed {len(built.passages)} passages, {len(built.terms)} terms -> {INDEX_DIR}")
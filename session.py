@@ -0,0 +1,217 @@
+# Session helpers shared by the app shell and the assessment pages
+
+import contextlib
+import time
+import uuid
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+import metrics
+from assessments import ASSESSMENTS, BY_KEY
+from export import export_bytes
+from jobs import RESULT, ResultsJob, make_pool
+from recommendations import results_sections
+from rollups import CohortRollup
+from session_state import HistoryRecord, SessionSpill
+from storage import ResultStore
+from trends import TrendTracker, load_trends
+
+
+# One result store (and writer thread) shared by every session; trends and
+# cohort rollups are updated as each result is written
+@st.cache_resource
+def get_result_store():
+    tracker = TrendTracker({assessment.key: assessment.score_field for assessment in ASSESSMENTS})
+    return ResultStore(hooks=(tracker, CohortRollup()))
+
+
+# Results pages are computed on one pool shared by every session
+@st.cache_resource
+def get_results_pool():
+    return make_pool()
+
+
+# Session state write-through to the shared backend (MINDBODY_STATE_BACKEND)
+# and idle-session spilling, with their threads, shared by every session
+@st.cache_resource
+def get_session_spill():
+    spill = SessionSpill()
+    metrics.collect(lambda: _session_state_samples(spill.metrics()))
+    return spill
+
+
+def _session_state_samples(values):
+    # SessionSpill.metrics() as OpenMetrics samples
+    return [
+        *(('mindbody_session_state_sessions', (('state', state),), values[f'{state}_sessions'])
+          for state in ('resident', 'stored')),
+        ('mindbody_session_state_sessions', (('state', 'pending'),), values['pending_writes']),
+        *(('mindbody_session_state_bytes', (('state', state),), values[f'{state}_bytes'])
+          for state in ('resident', 'stored')),
+        ('mindbody_session_state_bytes', (('state', 'max_resident_session'),), values['max_session_bytes']),
+        *(('mindbody_session_state_events', (('event', event),), values[counter])
+          for event, counter in (('spill', 'spills'), ('restore', 'restores'), ('expire', 'expired'), ('write', 'writes'))),
+        ('mindbody_session_state_written_bytes', (), values['written_bytes']),
+    ]
+
+
+def init_session():
+    # Stable user id kept in the URL, so a refresh finds the same saved history
+    if 'uid' not in st.query_params:
+        st.query_params['uid'] = uuid.uuid4().hex
+    st.session_state.user_id = st.query_params['uid']
+    restore_session(new_run=True)
+
+    # Initialize session state for user profile and recommendations
+    if 'user_profile' not in st.session_state:
+        saved = get_result_store().latest(st.session_state.user_id)
+        test_history = {test: HistoryRecord.from_result(BY_KEY[test], result)
+                        for test, result in saved.items() if test in BY_KEY}
+        st.session_state.user_profile = {
+            'name': '',
+            # Set from the Home profile or the BMI form; None until the user gives one
+            'age': None,
+            'completed_tests': [BY_KEY[test].name for test in test_history],
+            'test_history': test_history,
+            'last_visit': time.time()
+        }
+
+
+def restore_session(new_run=False):
+    # Brings back state spilled while this user was idle, or saved by another
+    # replica before this connection, and marks the session as running so
+    # the sweeper leaves it alone. Every entry point that reads the saved
+    # keys calls this first: script runs (through init_session, ended by
+    # finish_session) and fragment reruns and widget callbacks (through
+    # session_run, as they run without init_session).
+    ctx = get_script_run_ctx()
+    if ctx is not None and 'user_id' in st.session_state:
+        get_session_spill().touch(st.session_state.user_id, ctx.session_state, new_run)
+
+
+@contextlib.contextmanager
+def session_run():
+    # A fragment rerun or widget callback, with the session restored and running
+    ctx = get_script_run_ctx()
+    if ctx is None or 'user_id' not in st.session_state:
+        yield
+        return
+    with get_session_spill().running(st.session_state.user_id, ctx.session_state):
+        yield
+
+
+def finish_session():
+    # End of a script run: save this run's changes and let the sweeper spill the session again
+    sync_session()
+    ctx = get_script_run_ctx()
+    if ctx is not None and 'user_id' in st.session_state:
+        get_session_spill().release(st.session_state.user_id, ctx.session_state)
+
+
+def sync_session():
+    # Write this session's state through to the backend (debounced); a no-op
+    # when nothing changed. Called after each answer and at the end of a run.
+    ctx = get_script_run_ctx()
+    if ctx is not None and 'user_id' in st.session_state:
+        get_session_spill().save(st.session_state.user_id, ctx.session_state)
+
+
+def save_result(test_type, record):
+    # Keep a compact record in the session and queue the full result for the database
+    st.session_state.user_profile['test_history'][test_type] = HistoryRecord.from_result(BY_KEY[test_type], record)
+    get_result_store().submit(
+        st.session_state.user_id, test_type,
+        dict(record, age=st.session_state.user_profile['age'])
+    )
+
+    name = BY_KEY[test_type].name
+    if name not in st.session_state.user_profile['completed_tests']:
+        st.session_state.user_profile['completed_tests'].append(name)
+
+
+def user_trends():
+    # Pre-aggregated per-test trends for the current user
+    return load_trends(get_result_store().path, st.session_state.user_id)
+
+
+def user_export(fmt):
+    # Download data for the current user's results, built only when the
+    # download button is clicked (after any queued results are written)
+    store = get_result_store()
+    user_id = st.session_state.user_id
+
+    def build():
+        store.flush()
+        return export_bytes(fmt, store.path, user_id=user_id)
+    return build
+
+
+def stream_results(test, score, layout, on_result, facts=None):
+    # Score and build the results page on the shared pool, filling the page
+    # in as each part is ready. on_result(result) runs here in the script
+    # thread (saving and headline numbers); the recommendations are built on
+    # the pool with facts(result) in one call memoized on the whole layout,
+    # then streamed into one placeholder per section. Navigating away
+    # interrupts the script, which cancels whatever has not started.
+    # Returns the result, or None.
+    summary = st.empty()
+    slots = [st.empty() for _ in layout]
+    build = metrics.timed(test, 'recommendations',
+                          lambda result: results_sections(test, facts(result) if facts else result, layout))
+    progress = st.progress(0.0, text="🔄 Analyzing your answers...")
+    job = ResultsJob(get_results_pool(), metrics.timed(test, 'score', score), {'recommendations': build})
+    started = time.monotonic()
+    result, finished = None, 0
+    try:
+        with metrics.span(test, 'results'):
+            for event in job.events():
+                if event is None:
+                    # Also gives Streamlit a chance to interrupt the script
+                    progress.progress(finished / 2,
+                                      text=f"🔄 Preparing your results... {time.monotonic() - started:.1f}s")
+                    continue
+                key, value = event
+                if key == RESULT:
+                    result = value
+                    with summary.container():
+                        on_result(result)
+                else:
+                    for slot, markdown in zip(slots, value):
+                        if markdown:
+                            slot.markdown(markdown, unsafe_allow_html=True)
+                finished += 1
+                progress.progress(finished / 2, text="🔄 Preparing your recommendations...")
+    finally:
+        job.cancel()
+    progress.empty()
+    return result
+
+
+def move_wizard_step(step_key, delta, total):
+    with session_run():
+        st.session_state[step_key] = min(max(st.session_state.get(step_key, 0) + delta, 0), total - 1)
+
+
+def render_wizard(step_key, questions, render_question):
+    # Render only the current question plus Back/Next navigation.
+    # Returns True when the last question is showing.
+    if step_key not in st.session_state:
+        st.session_state[step_key] = 0
+    step = st.session_state[step_key]
+    total = len(questions)
+
+    render_question(step, questions[step], total)
+
+    col_back, col_pos, col_next = st.columns([1, 2, 1])
+    with col_back:
+        st.button("⬅️ Back", key=f"{step_key}_back", disabled=step == 0,
+                  on_click=move_wizard_step, args=(step_key, -1, total))
+    with col_pos:
+        st.markdown(f"**Question {step + 1} of {total}**")
+    with col_next:
+        st.button("Next ➡️", key=f"{step_key}_next", disabled=step == total - 1,
+                  on_click=move_wizard_step, args=(step_key, 1, total))
+
+    return step == total - 1
+
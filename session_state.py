@@ -0,0 +1,653 @@
+# Compact per-session state, shared through a pluggable backend.
+# Answers are kept as one signed byte per question and saved results as small
+# fixed records, so a session's resident state stays a few hundred bytes.
+# Every change is written through to a state backend (in-memory, SQLite or a
+# Redis server, chosen by MINDBODY_STATE_BACKEND), debounced so a burst of
+# answers is one write. A session that starts without state (a new
+# connection, possibly to another replica) reads it back from the backend,
+# so replicas can share users behind a plain load balancer and a restart
+# keeps in-progress tests. A sweeper thread drops the state of sessions that
+# have been idle too long (or the least recently active ones once too many
+# are resident) from memory, skipping sessions with a script run in
+# progress; the next rerun of that user reads it back.
+#
+# Saved state is never unpickled: each saved key is encoded explicitly (JSON
+# for the profile, steps and adaptive test, raw bytes for answer vectors),
+# so whoever can write to the backend can only hand replicas data.
+
+import atexit
+import contextlib
+import datetime
+import hashlib
+import json
+import os
+import socket
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+from storage import DEFAULT_DB_PATH, connect
+
+# Session state keys that are saved and restored as a unit
+SPILL_KEYS = ('user_profile', 'iq_answers', 'stress_answers', 'iq_adaptive', 'iq_step', 'stress_step')
+
+IDLE_SECONDS = 15 * 60
+MAX_RESIDENT_SESSIONS = 2000
+SWEEP_INTERVAL = 30.0
+# Saved state nobody came back for is deleted after this long
+STATE_TTL = 7 * 24 * 3600
+# Seconds a changed state waits before it is written, and between retries
+WRITE_DEBOUNCE = 1.0
+WRITE_RETRY = 5.0
+# A session marked as running is spilled anyway once it has been idle this
+# long (its run was interrupted before it could release the session)
+RUN_TIMEOUT = 5 * 60
+
+STATE_BACKEND = os.environ.get("MINDBODY_STATE_BACKEND", "sqlite")
+REDIS_URL = os.environ.get("MINDBODY_REDIS_URL", "redis://127.0.0.1:6379/0")
+
+STATE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS session_state (
+    user_id TEXT PRIMARY KEY,
+    saved_at REAL NOT NULL,
+    state BLOB NOT NULL
+);
+"""
+
+
+class AnswerVector:
+    """Answers to one test as one signed byte per question (-1 = unanswered).
+
+    Behaves like the {question index: answer code} dict it replaces:
+    len() is the number of answered questions and get() returns the code.
+    """
+
+    __slots__ = ('codes',)
+
+    def __init__(self, size):
+        self.codes = array('b', [-1]) * size
+
+    @property
+    def size(self):
+        return len(self.codes)
+
+    def __len__(self):
+        return len(self.codes) - self.codes.count(-1)
+
+    def __getitem__(self, i):
+        code = self.codes[i]
+        if code < 0:
+            raise KeyError(i)
+        return code
+
+    def __setitem__(self, i, code):
+        self.codes[i] = code
+
+    def get(self, i, default=None):
+        code = self.codes[i] if 0 <= i < len(self.codes) else -1
+        return default if code < 0 else code
+
+    def items(self):
+        return [(i, code) for i, code in enumerate(self.codes) if code >= 0]
+
+    def to_bytes(self):
+        return self.codes.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data):
+        vector = cls(0)
+        vector.codes = array('b', data)
+        return vector
+
+
+@dataclass(frozen=True, slots=True)
+class HistoryRecord:
+    """The part of a saved result a session keeps (the full result is in the database)."""
+    score: float
+    label: str
+    created_at: float
+
+    @property
+    def date(self):
+        return datetime.datetime.fromtimestamp(self.created_at)
+
+    @classmethod
+    def from_result(cls, assessment, result):
+        date = result.get('date')
+        created_at = date.timestamp() if isinstance(date, datetime.datetime) else time.time()
+        label = result.get(assessment.label_field) if assessment.label_field else None
+        return cls(float(result.get(assessment.score_field, 0.0)), label, created_at)
+
+    def to_dict(self):
+        return {'score': self.score, 'label': self.label, 'created_at': self.created_at}
+
+    @classmethod
+    def from_dict(cls, doc):
+        label = doc['label']
+        return cls(float(doc['score']), None if label is None else str(label), float(doc['created_at']))
+
+
+# Saved state format: STATE_FORMAT, the JSON header's length (4 bytes, big
+# endian), the JSON header {'values': {key: JSON value}, 'answers': {key:
+# length}}, then each answer vector's raw bytes in the header's key order
+STATE_FORMAT = b'mbs1'
+ANSWER_KEYS = ('iq_answers', 'stress_answers')
+
+
+def _profile_to_json(profile):
+    return {
+        'name': profile['name'],
+        'age': profile['age'],
+        'completed_tests': list(profile['completed_tests']),
+        'test_history': {test: record.to_dict() for test, record in profile['test_history'].items()},
+        'last_visit': profile['last_visit'],
+    }
+
+
+def _profile_from_json(doc):
+    return {
+        'name': str(doc['name']),
+        'age': None if doc['age'] is None else int(doc['age']),
+        'completed_tests': [str(name) for name in doc['completed_tests']],
+        'test_history': {str(test): HistoryRecord.from_dict(record) for test, record in doc['test_history'].items()},
+        'last_visit': float(doc['last_visit']),
+    }
+
+
+def _adaptive_from_json(doc):
+    # Imported here so only sessions with an adaptive test load numpy
+    from adaptive import AdaptiveTest
+    return AdaptiveTest.from_dict(doc)
+
+
+# key: (to JSON, from JSON) for every saved key besides the answer vectors
+VALUE_CODECS = {
+    'user_profile': (_profile_to_json, _profile_from_json),
+    'iq_adaptive': (lambda test: test.to_dict(), _adaptive_from_json),
+    'iq_step': (int, int),
+    'stress_step': (int, int),
+}
+
+
+def encode_state(values):
+    """Saved keys of a session as bytes (see STATE_FORMAT)."""
+    keys = sorted(values)
+    answers = {key: values[key].to_bytes() for key in keys if key in ANSWER_KEYS}
+    header = json.dumps({
+        'values': {key: VALUE_CODECS[key][0](values[key]) for key in keys if key in VALUE_CODECS},
+        'answers': {key: len(data) for key, data in answers.items()},
+    }, separators=(',', ':')).encode('utf-8')
+    return b''.join([STATE_FORMAT, len(header).to_bytes(4, 'big'), header, *answers.values()])
+
+
+def decode_state(blob):
+    """The saved keys in a blob from encode_state; ValueError if it is not one."""
+    if blob[:len(STATE_FORMAT)] != STATE_FORMAT:
+        raise ValueError("Not saved session state (or saved in an older format)")
+    start = len(STATE_FORMAT) + 4
+    end = start + int.from_bytes(blob[len(STATE_FORMAT):start], 'big')
+    try:
+        header = json.loads(blob[start:end])
+        values = {key: VALUE_CODECS[key][1](doc) for key, doc in header['values'].items()}
+        for key, size in header['answers'].items():
+            if key not in ANSWER_KEYS or not isinstance(size, int) or not 0 <= size <= len(blob) - end:
+                raise ValueError(f"Bad answer vector {key!r}")
+            values[key] = AnswerVector.from_bytes(blob[end:end + size])
+            end += size
+    except (KeyError, TypeError, AttributeError) as exc:
+        raise ValueError(f"Malformed session state: {exc!r}") from None
+    return values
+
+
+# State backends store one encoded blob per user id. Each provides
+# load(user_id) -> bytes or None, save_many([(user_id, blob)]),
+# expire(before) -> number deleted and stats() -> (sessions, bytes).
+
+class MemoryBackend:
+    """Saved state in this process only (a single replica, or tests)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._states = {}  # user_id -> (saved_at, blob)
+
+    def load(self, user_id):
+        with self._lock:
+            entry = self._states.get(user_id)
+        return None if entry is None else entry[1]
+
+    def save_many(self, items):
+        saved_at = time.time()
+        with self._lock:
+            for user_id, blob in items:
+                self._states[user_id] = (saved_at, blob)
+
+    def expire(self, before):
+        with self._lock:
+            expired = [user_id for user_id, (saved_at, _) in self._states.items() if saved_at < before]
+            for user_id in expired:
+                del self._states[user_id]
+        return len(expired)
+
+    def stats(self):
+        with self._lock:
+            return len(self._states), sum(len(blob) for _, blob in self._states.values())
+
+
+class SQLiteBackend:
+    """Saved state in the app database (replicas on one host, or a shared volume)."""
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        conn = connect(path)
+        try:
+            conn.executescript(STATE_SCHEMA)
+            # Carry over state spilled before the backends existed
+            if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'session_spill'").fetchone():
+                with conn:
+                    conn.execute("INSERT OR IGNORE INTO session_state SELECT user_id, spilled_at, state FROM session_spill")
+                    conn.execute("DROP TABLE session_spill")
+        finally:
+            conn.close()
+
+    def load(self, user_id):
+        conn = connect(self.path)
+        try:
+            row = conn.execute("SELECT state FROM session_state WHERE user_id = ?", (user_id,)).fetchone()
+        finally:
+            conn.close()
+        return None if row is None else row[0]
+
+    def save_many(self, items):
+        saved_at = time.time()
+        conn = connect(self.path)
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO session_state (user_id, saved_at, state) VALUES (?, ?, ?)",
+                    [(user_id, saved_at, blob) for user_id, blob in items],
+                )
+        finally:
+            conn.close()
+
+    def expire(self, before):
+        conn = connect(self.path)
+        try:
+            with conn:
+                return conn.execute("DELETE FROM session_state WHERE saved_at < ?", (before,)).rowcount
+        finally:
+            conn.close()
+
+    def stats(self):
+        conn = connect(self.path)
+        try:
+            return conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(state)), 0) FROM session_state"
+            ).fetchone()
+        finally:
+            conn.close()
+
+
+class RedisBackend:
+    """Saved state in a Redis server, or anything speaking its protocol.
+
+    Uses one pipelined connection (reconnecting once on a network error) and
+    lets the server expire keys after STATE_TTL.
+    """
+
+    def __init__(self, url=REDIS_URL, prefix="mindbody:session:", timeout=5.0):
+        parts = urlsplit(url)
+        self.address = (parts.hostname or '127.0.0.1', parts.port or 6379)
+        self.password = parts.password
+        self.db = int(parts.path.lstrip('/') or 0)
+        self.prefix = prefix
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._sock = None
+        self._reader = None
+
+    def load(self, user_id):
+        return self._pipeline([('GET', self.prefix + user_id)])[0]
+
+    def save_many(self, items):
+        self._pipeline([('SET', self.prefix + user_id, blob, 'EX', STATE_TTL) for user_id, blob in items])
+
+    def expire(self, before):
+        return 0
+
+    def stats(self):
+        keys, cursor = [], '0'
+        while True:
+            cursor, batch = self._pipeline([('SCAN', cursor, 'MATCH', self.prefix + '*', 'COUNT', 1000)])[0]
+            keys += batch
+            if cursor == b'0':
+                break
+            cursor = cursor.decode()
+        sizes = self._pipeline([('STRLEN', key) for key in keys]) if keys else []
+        return len(keys), sum(sizes)
+
+    def _pipeline(self, commands):
+        with self._lock:
+            for attempt in (1, 2):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    self._sock.sendall(b''.join(_resp_command(command) for command in commands))
+                    return [self._read() for _ in commands]
+                except OSError:
+                    self._close()
+                    if attempt == 2:
+                        raise
+                except Exception:
+                    # Replies still unread would answer the next commands
+                    self._close()
+                    raise
+
+    def _connect(self):
+        self._sock = socket.create_connection(self.address, timeout=self.timeout)
+        self._reader = self._sock.makefile('rb')
+        setup = [('AUTH', self.password)] if self.password else []
+        if self.db:
+            setup.append(('SELECT', self.db))
+        if setup:
+            self._sock.sendall(b''.join(_resp_command(command) for command in setup))
+            for _ in setup:
+                self._read()
+
+    def _close(self):
+        if self._sock is not None:
+            self._reader.close()
+            self._sock.close()
+        self._sock = self._reader = None
+
+    def _read(self):
+        line = self._reader.readline()
+        if not line.endswith(b'\r\n'):
+            raise ConnectionError("Redis connection closed")
+        kind, value = line[:1], line[1:-2]
+        if kind == b'+':
+            return value
+        if kind == b'-':
+            raise RuntimeError(f"Redis error: {value.decode(errors='replace')}")
+        if kind == b':':
+            return int(value)
+        if kind == b'$':
+            size = int(value)
+            return None if size < 0 else self._reader.read(size + 2)[:-2]
+        if kind == b'*':
+            size = int(value)
+            return None if size < 0 else [self._read() for _ in range(size)]
+        raise ConnectionError(f"Unexpected Redis reply {line[:32]!r}")
+
+
+def _resp_command(args):
+    parts = [arg if isinstance(arg, bytes) else str(arg).encode('utf-8') for arg in args]
+    return b''.join([f"*{len(parts)}\r\n".encode()] + [b"$%d\r\n%s\r\n" % (len(part), part) for part in parts])
+
+
+BACKENDS = {
+    'memory': MemoryBackend,
+    'sqlite': SQLiteBackend,
+    'redis': RedisBackend,
+}
+
+
+def make_backend(name=None):
+    name = name or STATE_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown session state backend {name!r}; expected one of: {', '.join(BACKENDS)}")
+    return BACKENDS[name]()
+
+
+class _Resident:
+    # Holds the session's state until it is spilled; sessions Streamlit has
+    # closed simply go idle and are spilled like any other
+    __slots__ = ('state', 'last_active', 'lock', 'digest', 'size', 'spilled', 'runs')
+
+    def __init__(self, state):
+        self.state = state
+        self.last_active = time.monotonic()
+        self.lock = threading.Lock()
+        self.digest = None  # of the state last handed to the backend
+        self.size = 0
+        self.spilled = False
+        self.runs = 0  # script runs, fragment reruns and callbacks in progress
+
+    def running(self, now):
+        # Caller holds lock
+        return self.runs > 0 and now - self.last_active < RUN_TIMEOUT
+
+
+class SessionSpill:
+    """Tracks live sessions by user id, writes their state through and spills idle ones."""
+
+    def __init__(self, backend=None, idle_seconds=IDLE_SECONDS, max_resident=MAX_RESIDENT_SESSIONS,
+                 sweep_interval=SWEEP_INTERVAL, write_debounce=WRITE_DEBOUNCE):
+        self.backend = make_backend() if backend is None else backend
+        self.idle_seconds = idle_seconds
+        self.max_resident = max_resident
+        self.write_debounce = write_debounce
+        self._lock = threading.Lock()
+        self._resident = {}  # user_id -> _Resident
+        self._counters = {'spills': 0, 'restores': 0, 'unreadable': 0, 'expired': 0, 'writes': 0, 'written_bytes': 0}
+        # Debounced writes: user_id -> (due, blob); whoever takes pending
+        # writes holds _write_lock until they are written, so writes land in order
+        self._pending = {}
+        self._writes = threading.Condition()
+        self._write_lock = threading.Lock()
+
+        self._writer = threading.Thread(target=self._write_loop, name="session-writer", daemon=True)
+        self._writer.start()
+        # Write what is still pending on interpreter shutdown
+        atexit.register(self.flush)
+        if sweep_interval:
+            self._sweeper = threading.Thread(
+                target=self._sweep_loop, args=(sweep_interval,), name="session-sweeper", daemon=True
+            )
+            self._sweeper.start()
+
+    def touch(self, user_id, state, new_run=False):
+        """Mark a session active and running; reads its state back first if it has none here.
+
+        Call at the start of every script run (new_run=True) and of every
+        fragment rerun or widget callback, before it reads the state, and
+        release() the session when it ends. Running sessions are not spilled.
+        """
+        state = _session(state)
+        with self._lock:
+            resident = self._resident.get(user_id)
+            fresh = resident is None or resident.state is not state
+            if fresh:
+                resident = self._resident[user_id] = _Resident(state)
+        # Waits for an in-progress spill of this session to finish
+        with resident.lock:
+            if resident.spilled:
+                resident.spilled = False
+                with self._lock:
+                    self._resident[user_id] = resident
+                fresh = True
+            resident.last_active = time.monotonic()
+            # Streamlit runs one script per session at a time, so a new run
+            # also ends the count left by an interrupted one
+            resident.runs = 1 if new_run else resident.runs + 1
+            if fresh:
+                self._restore(user_id, resident, state)
+
+    def release(self, user_id, state):
+        """End a run started with touch()."""
+        state = _session(state)
+        with self._lock:
+            resident = self._resident.get(user_id)
+        if resident is not None and resident.state is state:
+            with resident.lock:
+                resident.runs = max(resident.runs - 1, 0)
+
+    @contextlib.contextmanager
+    def running(self, user_id, state):
+        """touch() and release() around a fragment rerun or widget callback."""
+        self.touch(user_id, state)
+        try:
+            yield
+        finally:
+            self.release(user_id, state)
+
+    def save(self, user_id, state):
+        """Write a session's state through to the backend if it changed.
+
+        The write happens write_debounce seconds after the first change, with
+        the latest state saved by then, so answering several questions in a
+        row is one write.
+        """
+        state = _session(state)
+        with self._lock:
+            resident = self._resident.get(user_id)
+        if resident is None or resident.state is not state:
+            return
+        blob = _snapshot(state)
+        digest = _digest(blob)
+        if digest == resident.digest:
+            return
+        resident.digest, resident.size = digest, len(blob)
+        with self._writes:
+            due = self._pending[user_id][0] if user_id in self._pending else time.monotonic() + self.write_debounce
+            self._pending[user_id] = (due, blob)
+            self._writes.notify()
+
+    def flush(self, user_id=None):
+        """Write pending state now: one user's, or everyone's."""
+        with self._write_lock:
+            with self._writes:
+                if user_id is None:
+                    items = [(pending_id, blob) for pending_id, (_, blob) in self._pending.items()]
+                    self._pending.clear()
+                else:
+                    entry = self._pending.pop(user_id, None)
+                    items = [] if entry is None else [(user_id, entry[1])]
+            self._write(items)
+
+    def sweep(self, now=None):
+        """Spill idle sessions, then the least recently active beyond the cap (unless running)."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            residents = sorted(self._resident.items(), key=lambda entry: entry[1].last_active)
+        excess = len(residents) - self.max_resident
+        for position, (user_id, resident) in enumerate(residents):
+            if position < excess or now - resident.last_active >= self.idle_seconds:
+                self._spill(user_id, resident, resident.state, now)
+        self._counters['expired'] += self.backend.expire(time.time() - STATE_TTL)
+
+    def metrics(self):
+        """Resident/saved session counts and per-session state sizes (bytes), also exported by metrics.py."""
+        with self._lock:
+            sizes = [resident.size for resident in self._resident.values()]
+        with self._writes:
+            pending = len(self._pending)
+        stored, stored_size = self.backend.stats()
+        return {
+            'resident_sessions': len(sizes),
+            'resident_bytes': sum(sizes),
+            'max_session_bytes': max(sizes, default=0),
+            'mean_session_bytes': sum(sizes) / len(sizes) if sizes else 0.0,
+            'stored_sessions': stored,
+            'stored_bytes': stored_size,
+            'pending_writes': pending,
+            **self._counters,
+        }
+
+    def _forget(self, user_id, resident):
+        with self._lock:
+            if self._resident.get(user_id) is resident:
+                del self._resident[user_id]
+
+    def _spill(self, user_id, resident, state, now):
+        # Holding the lock keeps touch() (a run starting) out until the spill is done
+        with resident.lock:
+            if resident.spilled or resident.running(now):
+                return
+            blob = _snapshot(state)
+            with self._write_lock:
+                with self._writes:
+                    pending = self._pending.pop(user_id, None)
+                if pending is not None or _digest(blob) != resident.digest:
+                    self._write([(user_id, blob)])
+            for key in SPILL_KEYS:
+                if key in state:
+                    del state[key]
+            resident.spilled = True
+            self._forget(user_id, resident)
+            self._counters['spills'] += 1
+
+    def _restore(self, user_id, resident, state):
+        # This process's own unwritten state is newer than the backend's
+        with self._writes:
+            entry = self._pending.get(user_id)
+        blob = entry[1] if entry is not None else self.backend.load(user_id)
+        try:
+            values = None if blob is None else decode_state(blob)
+        except ValueError:
+            # Unreadable state is skipped, as if nothing was saved
+            self._counters['unreadable'] += 1
+            values = None
+        if values is not None:
+            for key, value in values.items():
+                if key not in state:
+                    state[key] = value
+            self._counters['restores'] += 1
+        # The digest is of what the backend has, so state set before this
+        # session was tracked here is still written when it is spilled
+        resident.digest = None if values is None else _digest(blob)
+        resident.size = len(_snapshot(state))
+
+    def _write(self, items):
+        # Caller holds _write_lock
+        if not items:
+            return
+        self.backend.save_many(items)
+        self._counters['writes'] += len(items)
+        self._counters['written_bytes'] += sum(len(blob) for _, blob in items)
+
+    def _write_loop(self):
+        while True:
+            with self._writes:
+                while True:
+                    now = time.monotonic()
+                    due = min((due for due, _ in self._pending.values()), default=None)
+                    if due is not None and due <= now:
+                        break
+                    self._writes.wait(None if due is None else due - now)
+            with self._write_lock:
+                with self._writes:
+                    now = time.monotonic()
+                    items = [(user_id, blob) for user_id, (due, blob) in self._pending.items() if due <= now]
+                    for user_id, _ in items:
+                        del self._pending[user_id]
+                try:
+                    self._write(items)
+                except Exception:
+                    # Backend unavailable: retry later, unless newer state arrived meanwhile
+                    with self._writes:
+                        for user_id, blob in items:
+                            self._pending.setdefault(user_id, (time.monotonic() + WRITE_RETRY, blob))
+
+    def _sweep_loop(self, interval):
+        while True:
+            time.sleep(interval)
+            try:
+                self.sweep()
+            except Exception:
+                # A failed sweep only delays eviction; try again next interval
+                pass
+
+
+def _session(state):
+    # Streamlit wraps a session's state in a new SafeSessionState every run
+    return getattr(state, '_state', state)
+
+
+def _snapshot(state):
+    return encode_state({key: state[key] for key in SPILL_KEYS if key in state})
+
+
+def _digest(blob):
+    return hashlib.blake2b(blob, digest_size=16).digest()
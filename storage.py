@@ -0,0 +1,192 @@
+# Durable result storage backed by SQLite.
+# Completed test results are queued and written by a background thread in
+# batches, so saving a result never blocks the Streamlit script thread.
+# Write hooks (e.g. trends.TrendTracker) update derived tables in the same
+# transaction as each batch, so aggregates never need a full-history scan.
+# A batch or hook that fails is logged and skipped; the writer keeps running.
+
+import atexit
+import datetime
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+DEFAULT_DB_PATH = os.environ.get(
+    "MINDBODY_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "mindbody.db")
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    test_type TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_user_test
+    ON results (user_id, test_type, created_at);
+CREATE INDEX IF NOT EXISTS idx_results_test_created
+    ON results (test_type, created_at);
+"""
+
+_STOP = object()
+
+logger = logging.getLogger(__name__)
+
+
+def _json_default(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot store {type(value).__name__} in a result")
+
+
+def connect(path, read_only=False):
+    """Open a connection with the pragmas every store connection uses."""
+    if read_only:
+        # For processes that only read what the app writes; never creates the file
+        return sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=30)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class ResultStore:
+    """Append-only store of completed test results, keyed by user and test type."""
+
+    def __init__(self, path=DEFAULT_DB_PATH, batch_size=100, flush_interval=0.25, hooks=()):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        # Each hook has setup(conn) and is called as hook(conn, rows) after a batch is inserted
+        self.hooks = tuple(hooks)
+        self._queue = queue.Queue()
+        self.failed_batches = 0
+        self.failed_hooks = 0
+
+        conn = connect(path)
+        conn.executescript(SCHEMA)
+        for hook in self.hooks:
+            with conn:
+                hook.setup(conn)
+        conn.close()
+
+        self._writer = threading.Thread(target=self._write_loop, name="result-writer", daemon=True)
+        self._writer.start()
+        # Drain pending writes on interpreter shutdown
+        atexit.register(self.close)
+
+    def submit(self, user_id, test_type, result, created_at=None):
+        """Queue a result for writing; returns immediately."""
+        created_at = time.time() if created_at is None else created_at
+        payload = json.dumps(result, default=_json_default, ensure_ascii=False)
+        self._queue.put((user_id, test_type, created_at, payload))
+
+    def flush(self):
+        """Block until every queued result has been written (or dropped after an error)."""
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                if not self._writer.is_alive():
+                    raise RuntimeError("The result writer has stopped; queued results were not written")
+                self._queue.all_tasks_done.wait(0.5)
+
+    def close(self):
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+
+    def _write_loop(self):
+        conn = connect(self.path)
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            # Collect whatever else arrives within the flush window
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            rows = [item for item in batch if item is not _STOP]
+            stopping = len(rows) != len(batch)
+            try:
+                if rows:
+                    with conn:
+                        self._insert(conn, rows)
+            except Exception:
+                # Only this batch is lost; the writer keeps serving the queue
+                self.failed_batches += 1
+                logger.exception("Could not write %d results", len(rows))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+        conn.close()
+
+    def _insert(self, conn, rows):
+        conn.executemany(
+            "INSERT INTO results (user_id, test_type, created_at, payload) VALUES (?, ?, ?, ?)",
+            rows,
+        )
+        for hook in self.hooks:
+            # A failing hook leaves its derived table behind, not the results
+            conn.execute("SAVEPOINT write_hook")
+            try:
+                hook(conn, rows)
+            except Exception:
+                conn.execute("ROLLBACK TO write_hook")
+                self.failed_hooks += 1
+                logger.exception("Write hook %s failed on %d results", type(hook).__name__, len(rows))
+            conn.execute("RELEASE write_hook")
+
+    def history(self, user_id, test_type=None, limit=None):
+        """Return a user's results, newest first, as (test_type, created_at, result)."""
+        query = "SELECT test_type, created_at, payload FROM results WHERE user_id = ?"
+        params = [user_id]
+        if test_type is not None:
+            query += " AND test_type = ?"
+            params.append(test_type)
+        query += " ORDER BY created_at DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        conn = connect(self.path)
+        try:
+            rows = conn.execute(query, params).fetchall()
+        finally:
+            conn.close()
+        return [(kind, created_at, json.loads(payload)) for kind, created_at, payload in rows]
+
+    def latest(self, user_id):
+        """Return the most recent result per test type for a user."""
+        return latest_results(self.path, user_id)
+
+
+def latest_results(path, user_id, read_only=False):
+    """The most recent result per test type for a user, without a ResultStore."""
+    conn = connect(path, read_only)
+    try:
+        rows = conn.execute(
+            """
+            SELECT test_type, MAX(created_at), payload FROM results
+            WHERE user_id = ? GROUP BY test_type
+            """,
+            (user_id,),
+        ).fetchall()
+    finally:
+        conn.close()
+
+    latest = {}
+    for test_type, created_at, payload in rows:
+        result = json.loads(payload)
+        result['date'] = datetime.datetime.fromtimestamp(created_at)
+        latest[test_type] = result
+    return latest
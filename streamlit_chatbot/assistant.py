@@ -0,0 +1,205 @@
+# Streamlit-free core of the wellness chatbot: model backends, the shared
+# response cache and the result context that grounds each conversation.
+#
+# Backends stream text chunks for (system prompt, history, prompt). They are
+# chosen by CHATBOT_BACKEND ('gemini' or 'stub'; default: gemini when
+# GOOGLE_API_KEY is set, else stub), so the app and its tests run offline.
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from scoring import WEAK_AREA_SHARE
+
+DEFAULT_MODEL = os.environ.get("CHATBOT_MODEL", "gemini-2.0-flash")
+# Previous turns sent with each prompt (older turns are dropped to bound cost)
+MAX_HISTORY_TURNS = 6
+CACHE_SIZE = 1024
+CACHE_TTL = 24 * 3600
+# Guidance passages retrieved for each prompt (see search_index.py)
+GUIDANCE_PASSAGES = 4
+
+SYSTEM_PROMPT = """You are a friendly wellness assistant inside a personal assessment app \
+with an IQ test, a BMI & nutrition calculator and a stress assessment.
+Ground your answers in the user's results below when they are relevant, and say so \
+when a question needs a test the user has not taken yet.
+Keep answers short and practical. You are not a doctor: do not diagnose, and suggest \
+a professional for medical or mental health concerns. If the user mentions self-harm \
+or a crisis, urge them to contact local emergency services or a crisis line right away.
+
+User's latest results:
+{context}
+{guidance}"""
+
+
+def result_context(latest):
+    """A compact, stable text summary of the user's latest result per test.
+
+    `latest` is storage.latest_results(path, user_id). Values are rounded so the
+    context (and therefore the cache key) only changes when results do.
+    """
+    lines = []
+    iq = latest.get('iq')
+    if iq:
+        lines.append(f"- IQ test ({iq['date']:%Y-%m-%d}): estimated IQ {iq['score']:.0f}, "
+                     f"{iq['percentage']:.0f}% correct")
+        # The weak areas the results page showed (older results did not store them)
+        weak = iq.get('weak_areas')
+        if weak is None:
+            scores = iq.get('category_scores') or {}
+            weak = [c for c, s in scores.items() if s.get('total') and s['correct'] / s['total'] < WEAK_AREA_SHARE]
+        if weak:
+            lines.append(f"  weaker areas: {', '.join(weak)}")
+    bmi = latest.get('bmi')
+    if bmi:
+        lines.append(f"- BMI check ({bmi['date']:%Y-%m-%d}): BMI {bmi['bmi']:.1f} ({bmi['category']}), "
+                     f"goal: {bmi.get('health_goal', 'n/a')}, activity: {bmi.get('activity_level', 'n/a')}")
+    stress = latest.get('stress')
+    if stress:
+        lines.append(f"- Stress assessment ({stress['date']:%Y-%m-%d}): {stress['percentage']:.0f}% "
+                     f"({stress['level']})")
+        scores = stress.get('category_scores') or {}
+        high = [c for c, s in scores.items() if s.get('percentage', 0) >= 60]
+        if high:
+            lines.append(f"  high-stress areas: {', '.join(high)}")
+    return "\n".join(lines) or "- No tests taken yet."
+
+
+class ResponseCache:
+    """Thread-safe LRU cache of complete answers with a time-to-live.
+
+    Shared by every session, so a repeated question with the same result
+    context (typical FAQ questions) is answered once per TTL.
+    """
+
+    def __init__(self, maxsize=CACHE_SIZE, ttl=CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, text)
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    @staticmethod
+    def key(*parts):
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(str(part).encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, text):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, text)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class GeminiBackend:
+    """Google Gemini through google-generativeai, with one shared client."""
+
+    def __init__(self, model=DEFAULT_MODEL, api_key=None):
+        import google.generativeai as genai
+        genai.configure(api_key=api_key or os.environ.get("GOOGLE_API_KEY"))
+        self.name = f"gemini:{model}"
+        # The system prompt carries per-user results, so it is sent as the
+        # first turn and one model object serves every session
+        self._model = genai.GenerativeModel(model)
+
+    def stream(self, system, history, prompt):
+        contents = [{'role': 'user', 'parts': [system]},
+                    {'role': 'model', 'parts': ["Understood."]}]
+        for role, text in history:
+            contents.append({'role': 'model' if role == 'assistant' else 'user', 'parts': [text]})
+        contents.append({'role': 'user', 'parts': [prompt]})
+        for chunk in self._model.generate_content(contents, stream=True):
+            try:
+                text = chunk.text
+            except ValueError:
+                # Blocked or empty candidate
+                continue
+            if text:
+                yield text
+
+
+class StubBackend:
+    """Offline backend for development and tests: a canned, grounded reply."""
+
+    name = "stub"
+
+    def __init__(self, delay=0.02):
+        self.delay = delay
+        self.calls = 0
+
+    def stream(self, system, history, prompt):
+        self.calls += 1
+        context = system.rsplit("User's latest results:\n", 1)[-1]
+        reply = (f"(offline stub) You asked: {prompt.strip()}\n\n"
+                 f"Based on your results:\n{context}")
+        for word in reply.split(' '):
+            if self.delay:
+                time.sleep(self.delay)
+            yield word + ' '
+
+
+BACKENDS = {
+    'gemini': GeminiBackend,
+    'stub': StubBackend,
+}
+
+
+def make_backend(name=None):
+    name = name or os.environ.get("CHATBOT_BACKEND") or ('gemini' if os.environ.get("GOOGLE_API_KEY") else 'stub')
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown chatbot backend {name!r}; expected one of: {', '.join(BACKENDS)}")
+    return BACKENDS[name]()
+
+
+class Assistant:
+    """Answers prompts with a backend, serving repeats from the cache."""
+
+    def __init__(self, backend, cache=None, retrieve=None):
+        self.backend = backend
+        self.cache = ResponseCache() if cache is None else cache
+        # retrieve(prompt, k) -> relevant guidance passages (strings), if any
+        self.retrieve = retrieve
+
+    def reply(self, context, history, prompt):
+        """(cached, chunks): whether the answer came from the cache, and its text chunks."""
+        history = list(history)[-2 * MAX_HISTORY_TURNS:]
+        key = self.cache.key(self.backend.name, context, history, ' '.join(prompt.split()).casefold())
+        cached = self.cache.get(key)
+        if cached is not None:
+            return True, iter((cached,))
+        return False, self._stream(key, context, history, prompt)
+
+    def _stream(self, key, context, history, prompt):
+        # Only complete answers are cached; a stream that fails or is
+        # abandoned midway (e.g. the user navigates away) is not stored
+        passages = self.retrieve(prompt, GUIDANCE_PASSAGES) if self.retrieve else ()
+        guidance = "".join(f"\n- {text}" for text in passages)
+        if guidance:
+            guidance = "\nRelevant guidance from the app:" + guidance
+        system = SYSTEM_PROMPT.format(context=context, guidance=guidance)
+        parts = []
+        for chunk in self.backend.stream(system, history, prompt):
+            parts.append(chunk)
+            yield chunk
+        self.cache.put(key, ''.join(parts))
@@ -1 +1,75 @@
+# Wellness chatbot grounded in the user's saved assessment results.
+# Open it with the same ?uid= as the main app so it can read that history:
+#
+#   streamlit run streamlit_chatbot/chatbot.py --server.port 8503
+#
+# Uses Gemini when GOOGLE_API_KEY is set, otherwise an offline stub (see
+# assistant.py; CHATBOT_BACKEND picks one explicitly).
 
+import os
+import sys
+import time
+
+import streamlit as st
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from assistant import Assistant, make_backend, result_context  # noqa: E402
+from search_index import search  # noqa: E402
+from storage import DEFAULT_DB_PATH, latest_results  # noqa: E402
+
+st.set_page_config(page_title="Wellness Chat", page_icon="💬")
+st.title("💬 Wellness Chat")
+
+
+def retrieve(prompt, k):
+    return [passage.text for _, passage in search(prompt, k)]
+
+
+# One backend client and response cache shared by every session
+@st.cache_resource
+def get_assistant():
+    return Assistant(make_backend(), retrieve=retrieve)
+
+
+def timed(chunks, started, timing):
+    # Records time to first token while passing chunks through
+    for chunk in chunks:
+        timing.setdefault('first_token', time.perf_counter() - started)
+        yield chunk
+
+
+assistant = get_assistant()
+user_id = st.query_params.get('uid')
+# Read-only: results are written by the main app (no store, writer thread or schema setup here)
+if user_id and os.path.exists(DEFAULT_DB_PATH):
+    context = result_context(latest_results(DEFAULT_DB_PATH, user_id, read_only=True))
+else:
+    context = result_context({})
+    st.info("Open this chat from the assessment app (with your ?uid=) to get answers based on your results.")
+
+with st.expander("📋 What the assistant knows about you"):
+    st.text(context)
+
+if 'chat' not in st.session_state:
+    st.session_state.chat = []
+
+for role, text in st.session_state.chat:
+    with st.chat_message(role):
+        st.markdown(text)
+
+if prompt := st.chat_input("Ask about your results, sleep, nutrition, stress..."):
+    with st.chat_message('user'):
+        st.markdown(prompt)
+
+    with st.chat_message('assistant'):
+        started, timing = time.perf_counter(), {}
+        try:
+            cached, chunks = assistant.reply(context, st.session_state.chat, prompt)
+            answer = st.write_stream(timed(chunks, started, timing))
+        except Exception as exc:
+            st.error(f"The assistant is unavailable right now ({type(exc).__name__}). Please try again.")
+        else:
+            st.session_state.chat += [('user', prompt), ('assistant', answer)]
+            source = "cached answer" if cached else assistant.backend.name
+            st.caption(f"⚡ {source} · first token in {timing.get('first_token', 0) * 1000:.0f} ms")
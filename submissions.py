@@ -0,0 +1,102 @@
+# Validation and scoring of raw submissions (plain dicts from JSON, CSV or
+# forms). Used by the HTTP API and batch tools so every entry point scores
+# exactly like the app does.
+
+from catalog import STRESS_OPTIONS
+from question_bank import iq_bank, stress_bank
+from scoring import (
+    ACTIVITY_MULTIPLIERS,
+    GOAL_ADJUSTMENTS,
+    STRESS_MAX_PER_QUESTION,
+    parse_stress_option,
+    score_bmi,
+    score_iq,
+    score_stress,
+)
+
+TEST_TYPES = ('iq', 'bmi', 'stress')
+
+
+class SubmissionError(ValueError):
+    """Raised when a submission is missing fields or has invalid values."""
+
+
+def _number(submission, field, low, high):
+    try:
+        value = float(submission[field])
+    except KeyError:
+        raise SubmissionError(f"'{field}' is required") from None
+    except (TypeError, ValueError):
+        raise SubmissionError(f"'{field}' must be a number") from None
+    if not low <= value <= high:
+        raise SubmissionError(f"'{field}' must be between {low} and {high}")
+    return value
+
+
+def _choice(submission, field, choices):
+    value = submission.get(field)
+    if value not in choices:
+        raise SubmissionError(f"'{field}' must be one of: {', '.join(choices)}")
+    return value
+
+
+def _answers(submission, count):
+    answers = submission.get('answers')
+    if not isinstance(answers, (list, tuple)):
+        raise SubmissionError("'answers' must be a list")
+    if len(answers) != count:
+        raise SubmissionError(f"'answers' must have {count} entries, got {len(answers)}")
+    return answers
+
+
+def _stress_value(answer):
+    if answer in STRESS_OPTIONS:
+        return parse_stress_option(answer)
+    # int() would also take True and truncate 2.7
+    if isinstance(answer, bool) or (isinstance(answer, float) and not answer.is_integer()):
+        raise SubmissionError(f"Invalid stress answer: {answer!r}")
+    try:
+        value = int(answer)
+    except (TypeError, ValueError, OverflowError):
+        raise SubmissionError(f"Invalid stress answer: {answer!r}") from None
+    if not 0 <= value <= STRESS_MAX_PER_QUESTION:
+        raise SubmissionError(f"Stress answers must be 0-{STRESS_MAX_PER_QUESTION}, got {value}")
+    return value
+
+
+def score_bmi_submission(submission):
+    return score_bmi(
+        _number(submission, 'height', 100, 250),
+        _number(submission, 'weight', 30, 200),
+        _number(submission, 'age', 13, 100),
+        _choice(submission, 'activity_level', tuple(ACTIVITY_MULTIPLIERS)),
+        _choice(submission, 'health_goal', tuple(GOAL_ADJUSTMENTS)),
+    )
+
+
+def score_stress_submission(submission):
+    bank = stress_bank()
+    answers = _answers(submission, len(bank))
+    return score_stress({i: _stress_value(answer) for i, answer in enumerate(answers)}, bank)
+
+
+def score_iq_submission(submission):
+    bank = iq_bank()
+    answers = _answers(submission, len(bank))
+    return score_iq(dict(enumerate(answers)), bank)
+
+
+SCORERS = {
+    'iq': score_iq_submission,
+    'bmi': score_bmi_submission,
+    'stress': score_stress_submission,
+}
+
+
+def score_submission(test_type, submission):
+    """Validate and score one submission of the given test type."""
+    if not isinstance(test_type, str) or test_type not in SCORERS:
+        raise SubmissionError(f"Unknown test type {test_type!r}; expected one of: {', '.join(TEST_TYPES)}")
+    if not isinstance(submission, dict):
+        raise SubmissionError("Submission must be a JSON object")
+    return SCORERS[test_type](submission)
@@ -0,0 +1,255 @@
+# Session state backends and the saved state format.
+# The Redis backend is tested against a small in-process stand-in that
+# speaks enough of the protocol (GET, SET EX, SCAN, STRLEN, AUTH, SELECT)
+# and can expire keys on a fake clock or drop its client connections.
+
+import fnmatch
+import pickle
+import socketserver
+import threading
+import time
+
+import pytest
+
+import session_state
+from session_state import (
+    AnswerVector,
+    HistoryRecord,
+    MemoryBackend,
+    RedisBackend,
+    SessionSpill,
+    decode_state,
+    encode_state,
+)
+
+
+class StandInRedis(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), _Handler)
+        self.data = {}  # key -> (value, expires at or None)
+        self.clock = 0.0
+        self.commands = []
+        self.connections = []
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        return f"redis://:secret@127.0.0.1:{self.server_address[1]}/2"
+
+    def live(self, key):
+        entry = self.data.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= self.clock:
+            del self.data[key]
+            return None
+        return entry
+
+    def drop_connections(self):
+        for connection in self.connections:
+            connection.close()
+        self.connections.clear()
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        self.server.connections.append(self.connection)
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            args = []
+            for _ in range(int(line[1:-2])):
+                size = int(self.rfile.readline()[1:-2])
+                args.append(self.rfile.read(size + 2)[:-2])
+            self.server.commands.append(args)
+            self.wfile.write(self.reply(args[0].upper(), args[1:]))
+
+    def reply(self, command, args):
+        server = self.server
+        if command in (b'AUTH', b'SELECT'):
+            return b'+OK\r\n'
+        if command == b'SET':
+            expires = server.clock + int(args[3]) if len(args) > 3 and args[2].upper() == b'EX' else None
+            server.data[args[0]] = (args[1], expires)
+            return b'+OK\r\n'
+        if command == b'GET':
+            entry = server.live(args[0])
+            return b'$-1\r\n' if entry is None else _bulk(entry[0])
+        if command == b'STRLEN':
+            entry = server.live(args[0])
+            return b':%d\r\n' % (0 if entry is None else len(entry[0]))
+        if command == b'SCAN':
+            keys = [key for key in list(server.data)
+                    if server.live(key) and fnmatch.fnmatchcase(key.decode(), args[2].decode())]
+            return b'*2\r\n' + _bulk(b'0') + b'*%d\r\n' % len(keys) + b''.join(map(_bulk, keys))
+        return b'-ERR unknown command\r\n'
+
+
+def _bulk(value):
+    return b'$%d\r\n%s\r\n' % (len(value), value)
+
+
+@pytest.fixture
+def redis():
+    server = StandInRedis()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_redis_save_and_load(redis):
+    backend = RedisBackend(redis.url)
+    backend.save_many([('alice', b'\x00state\xff'), ('bob', b'other')])
+
+    assert backend.load('alice') == b'\x00state\xff'
+    assert backend.load('bob') == b'other'
+    assert backend.load('carol') is None
+    assert backend.stats() == (2, len(b'\x00state\xff') + len(b'other'))
+    # Authenticated and selected the database from the URL before anything else
+    assert redis.commands[:2] == [[b'AUTH', b'secret'], [b'SELECT', b'2']]
+
+
+def test_redis_keys_expire_after_state_ttl(redis):
+    backend = RedisBackend(redis.url)
+    backend.save_many([('alice', b'state')])
+
+    assert redis.commands[-1] == [b'SET', b'mindbody:session:alice', b'state', b'EX', str(session_state.STATE_TTL).encode()]
+    redis.clock += session_state.STATE_TTL - 1
+    assert backend.load('alice') == b'state'
+    redis.clock += 1
+    assert backend.load('alice') is None
+    assert backend.stats() == (0, 0)
+
+
+def test_redis_reconnects_after_the_connection_drops(redis):
+    backend = RedisBackend(redis.url)
+    backend.save_many([('alice', b'state')])
+    redis.drop_connections()
+
+    assert backend.load('alice') == b'state'
+    backend.save_many([('alice', b'newer')])
+    assert backend.load('alice') == b'newer'
+
+
+def test_redis_unreachable_raises():
+    with socketserver.TCPServer(('127.0.0.1', 0), socketserver.BaseRequestHandler) as closed:
+        port = closed.server_address[1]
+    backend = RedisBackend(f"redis://127.0.0.1:{port}/0", timeout=1.0)
+    with pytest.raises(OSError):
+        backend.load('alice')
+
+
+def _profile():
+    return {
+        'name': 'Ada',
+        'age': 36,
+        'completed_tests': ['IQ Test'],
+        'test_history': {'iq': HistoryRecord(104.5, None, 1700000000.0)},
+        'last_visit': 1700000100.0,
+    }
+
+
+def test_state_round_trip():
+    answers = AnswerVector(5)
+    answers[0], answers[3] = 2, 4
+    values = {'user_profile': _profile(), 'stress_answers': answers, 'iq_answers': AnswerVector(3), 'stress_step': 3}
+
+    restored = decode_state(encode_state(values))
+
+    assert restored['user_profile'] == _profile()
+    assert restored['stress_answers'].items() == [(0, 2), (3, 4)]
+    assert restored['iq_answers'].size == 3 and len(restored['iq_answers']) == 0
+    assert restored['stress_step'] == 3
+
+
+def test_adaptive_test_round_trip():
+    from adaptive import AdaptiveTest, pool_for
+    from question_bank import iq_bank
+
+    test = AdaptiveTest(pool_for(iq_bank()))
+    for correct in (True, False, True):
+        test.answer(test.next_item(), correct)
+
+    restored = decode_state(encode_state({'iq_adaptive': test}))['iq_adaptive']
+
+    assert restored.administered == test.administered
+    assert restored.responses == test.responses
+    assert restored.theta == pytest.approx(test.theta)
+
+
+class _Payload:
+    ran = False
+
+    def __reduce__(self):
+        return (setattr, (_Payload, 'ran', True))
+
+
+@pytest.mark.parametrize('blob', [
+    pickle.dumps({'user_profile': _Payload()}),
+    session_state.STATE_FORMAT + (100).to_bytes(4, 'big') + b'{"values": ',
+    encode_state({'stress_step': 1}).replace(b'"stress_step":1', b'"stress_step":[]'),
+    encode_state({'iq_answers': AnswerVector(4)}).replace(b'"iq_answers":4', b'"iq_answers":99'),
+])
+def test_untrusted_state_is_rejected(blob):
+    with pytest.raises(ValueError):
+        decode_state(blob)
+    assert not _Payload.ran
+
+
+def test_unreadable_state_is_skipped_on_restore():
+    backend = MemoryBackend()
+    backend.save_many([('alice', pickle.dumps({'user_profile': _Payload()}))])
+    spill = SessionSpill(backend, sweep_interval=0)
+    state = {}
+
+    spill.touch('alice', state, new_run=True)
+
+    assert state == {}
+    assert spill.metrics()['unreadable'] == 1
+    assert not _Payload.ran
+
+
+def test_sweep_spills_idle_sessions_and_restores_them():
+    backend = MemoryBackend()
+    spill = SessionSpill(backend, sweep_interval=0, write_debounce=0)
+    state = {'user_profile': _profile(), 'stress_step': 2}
+    spill.touch('alice', state, new_run=True)
+    spill.release('alice', state)
+
+    spill.sweep(now=time.monotonic() + session_state.IDLE_SECONDS)
+    assert state == {}
+
+    spill.touch('alice', state)
+    assert state == {'user_profile': _profile(), 'stress_step': 2}
+
+
+def test_sweep_does_not_evict_running_sessions():
+    spill = SessionSpill(MemoryBackend(), max_resident=1, sweep_interval=0, write_debounce=0)
+    running = {'stress_step': 1}
+    finished = {'stress_step': 2}
+    spill.touch('running', running, new_run=True)
+    spill.touch('finished', finished, new_run=True)
+    spill.release('finished', finished)
+
+    # Over the cap, and the running session is the least recently active
+    spill.sweep(now=time.monotonic() + 60)
+    assert running == {'stress_step': 1}
+
+    with spill.running('finished', finished):
+        spill.release('running', running)
+        spill.sweep(now=time.monotonic() + 60)
+    assert running == {}
+    assert finished == {'stress_step': 2}
+
+
+def test_interrupted_runs_stop_counting_after_run_timeout():
+    spill = SessionSpill(MemoryBackend(), max_resident=0, sweep_interval=0, write_debounce=0)
+    state = {'stress_step': 1}
+    spill.touch('alice', state, new_run=True)  # never released
+
+    spill.sweep(now=time.monotonic() + session_state.RUN_TIMEOUT - 1)
+    assert state == {'stress_step': 1}
+    spill.sweep(now=time.monotonic() + session_state.RUN_TIMEOUT)
+    assert state == {}
@@ -0,0 +1,63 @@
+# Trends kept by the TrendTracker write hook, checked against a fold of the
+# saved results.
+
+import json
+
+import pytest
+
+from storage import SCHEMA, connect
+from trends import TrendTracker, load_trends
+
+DAY = 24 * 3600
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = str(tmp_path / "results.db")
+    conn = connect(path)
+    conn.executescript(SCHEMA)
+    tracker = TrendTracker({'bmi': 'bmi'})
+    tracker.setup(conn)
+
+    def write(*results):
+        # One ResultStore batch: the rows are inserted, then the hook runs
+        rows = [('alice', 'bmi', created_at, json.dumps({'bmi': value})) for created_at, value in results]
+        with conn:
+            conn.executemany(
+                "INSERT INTO results (user_id, test_type, created_at, payload) VALUES (?, ?, ?, ?)", rows
+            )
+            tracker(conn, rows)
+
+    yield path, write
+    conn.close()
+
+
+def test_results_in_order_are_added(db):
+    path, write = db
+    write((10 * DAY, 22.0))
+    write((17 * DAY, 23.0), (24 * DAY, 21.0))
+
+    trend = load_trends(path, 'alice')['bmi']
+
+    assert trend.count == 3
+    assert trend.last_value == 21.0
+    assert trend.delta == -2.0
+    assert trend.moving_average == pytest.approx(22.0)
+    assert [t for t, _, _ in trend.points] == [10 * DAY, 17 * DAY, 24 * DAY]
+
+
+def test_back_dated_result_in_a_batch_with_newer_ones_is_counted_once(db):
+    path, write = db
+    write((10 * DAY, 22.0))
+    # An import: one result older than the trend, two newer
+    write((3 * DAY, 24.0), (17 * DAY, 23.0), (24 * DAY, 21.0))
+
+    trend = load_trends(path, 'alice')['bmi']
+
+    assert trend.count == 4
+    assert [(t, v) for t, v, _ in trend.points] == [
+        (3 * DAY, 24.0), (10 * DAY, 22.0), (17 * DAY, 23.0), (24 * DAY, 21.0),
+    ]
+    assert trend.first_at == 3 * DAY
+    assert trend.delta == -2.0
+    assert trend.moving_average == pytest.approx(22.5)
@@ -0,0 +1,231 @@
+# Per-user result trends, maintained incrementally.
+# TrendTracker is a ResultStore write hook: each new result is folded into a
+# small per-(user, test) row holding the attempt count, latest value and
+# delta, a moving average, the weekly check-in streak and the most recent
+# points for charting. Reading a user's trends is one indexed lookup of at
+# most one row per test, however many years of results they have.
+
+import base64
+import datetime
+import json
+import time
+from dataclasses import dataclass
+
+from storage import connect
+
+# Points kept per trend for charts (two years of weekly check-ins)
+RECENT_POINTS = 104
+# Attempts averaged by the moving average
+MA_WINDOW = 4
+WEEK_SECONDS = 7 * 24 * 3600
+
+TREND_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trends (
+    user_id TEXT NOT NULL,
+    test_type TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    first_at REAL NOT NULL,
+    last_at REAL NOT NULL,
+    last_value REAL NOT NULL,
+    delta REAL,
+    moving_average REAL NOT NULL,
+    week_streak INTEGER NOT NULL,
+    points TEXT NOT NULL,
+    PRIMARY KEY (user_id, test_type)
+);
+"""
+
+
+def week_number(timestamp):
+    # Weeks start on Monday (1970-01-01 was a Thursday)
+    return int((timestamp + 3 * 24 * 3600) // WEEK_SECONDS)
+
+
+@dataclass(frozen=True, slots=True)
+class Trend:
+    count: int
+    first_at: float
+    last_at: float
+    last_value: float
+    delta: float            # change from the previous attempt (None for the first)
+    moving_average: float   # mean of the last MA_WINDOW attempts
+    week_streak: int        # consecutive weeks with an attempt, up to last_at
+    points: tuple           # recent (created_at, value, moving_average)
+
+    @property
+    def last_date(self):
+        return datetime.datetime.fromtimestamp(self.last_at)
+
+    def current_streak(self, now=None):
+        """The streak if it is still alive (an attempt this week or last week)."""
+        now = time.time() if now is None else now
+        return self.week_streak if week_number(now) - week_number(self.last_at) <= 1 else 0
+
+    def sparkline_html(self, width=240, height=60):
+        """The recent points (solid) and moving average (dashed) as an inline SVG image.
+
+        Drawn here rather than with st.line_chart, which would load pandas
+        and pyarrow on the Home page.
+        """
+        times = [t for t, _, _ in self.points]
+        values = [v for _, v, a in self.points] + [a for _, _, a in self.points]
+        low, high = min(values), max(values)
+        t_span = (times[-1] - times[0]) or 1.0
+        v_span = (high - low) or 1.0
+        pad = 4
+
+        def line(column, style):
+            coords = " ".join(
+                f"{pad + (t - times[0]) / t_span * (width - 2 * pad):.1f},"
+                f"{height - pad - (point[column] - low) / v_span * (height - 2 * pad):.1f}"
+                for t, point in zip(times, self.points)
+            )
+            return f'<polyline points="{coords}" fill="none" stroke="#667eea" stroke-width="2" {style}/>'
+
+        svg = (
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+            f'viewBox="0 0 {width} {height}">'
+            + line(1, '') + line(2, 'stroke-dasharray="4 3" opacity="0.6"')
+            + '</svg>'
+        )
+        label = f"Last {len(self.points)} attempts: {low:.1f} to {high:.1f}"
+        return (f'<img src="data:image/svg+xml;base64,{base64.b64encode(svg.encode()).decode()}" '
+                f'alt="{label}" title="{label}" width="{width}" height="{height}">')
+
+    def add(self, created_at, value):
+        """The trend after one more attempt (created_at must not be older than last_at)."""
+        values = [v for _, v, _ in self.points[-(MA_WINDOW - 1):]] + [value]
+        average = sum(values) / len(values)
+        weeks = week_number(created_at) - week_number(self.last_at)
+        streak = self.week_streak if weeks == 0 else self.week_streak + 1 if weeks == 1 else 1
+        return Trend(
+            self.count + 1, self.first_at, created_at, value, value - self.last_value,
+            average, streak, (self.points + ((created_at, value, average),))[-RECENT_POINTS:],
+        )
+
+    @classmethod
+    def start(cls, created_at, value):
+        return cls(1, created_at, created_at, value, None, value, 1, ((created_at, value, value),))
+
+
+def _trend_value(payload, field):
+    try:
+        value = json.loads(payload).get(field)
+        return None if value is None else float(value)
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+class TrendTracker:
+    """ResultStore hook that keeps the trends table current.
+
+    fields maps each test type to the result field that is tracked,
+    e.g. {'bmi': 'bmi', 'iq': 'score', 'stress': 'percentage'}.
+    """
+
+    def __init__(self, fields):
+        self.fields = dict(fields)
+
+    def setup(self, conn):
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'trends'"
+        ).fetchone()
+        conn.executescript(TREND_SCHEMA)
+        if not exists:
+            # First run against an existing database: build from saved results
+            pairs = conn.execute("SELECT DISTINCT user_id, test_type FROM results").fetchall()
+            for user_id, test_type in pairs:
+                self._rebuild(conn, user_id, test_type)
+
+    def __call__(self, conn, rows):
+        trends = {}
+        refold = set()
+        for user_id, test_type, created_at, payload in sorted(rows, key=lambda row: row[2]):
+            field = self.fields.get(test_type)
+            value = None if field is None else _trend_value(payload, field)
+            if value is None:
+                continue
+            key = (user_id, test_type)
+            if key in refold:
+                continue
+            if key not in trends:
+                trends[key] = _load(conn, user_id, test_type)
+            trend = trends[key]
+            if trend is None:
+                trends[key] = Trend.start(created_at, value)
+            elif created_at >= trend.last_at:
+                trends[key] = trend.add(created_at, value)
+            else:
+                # Back-dated result (e.g. an import): refold this pair from its
+                # results below, which already include the rest of this batch
+                refold.add(key)
+        for user_id, test_type in refold:
+            trends[user_id, test_type] = self._fold(conn, user_id, test_type)
+        for (user_id, test_type), trend in trends.items():
+            _save(conn, user_id, test_type, trend)
+
+    def _fold(self, conn, user_id, test_type):
+        field = self.fields[test_type]
+        trend = None
+        for created_at, payload in conn.execute(
+            "SELECT created_at, payload FROM results WHERE user_id = ? AND test_type = ? ORDER BY created_at",
+            (user_id, test_type),
+        ):
+            value = _trend_value(payload, field)
+            if value is not None:
+                trend = Trend.start(created_at, value) if trend is None else trend.add(created_at, value)
+        return trend
+
+    def _rebuild(self, conn, user_id, test_type):
+        if test_type in self.fields:
+            trend = self._fold(conn, user_id, test_type)
+            if trend is not None:
+                _save(conn, user_id, test_type, trend)
+
+
+def _load(conn, user_id, test_type):
+    row = conn.execute(
+        """
+        SELECT count, first_at, last_at, last_value, delta, moving_average, week_streak, points
+        FROM trends WHERE user_id = ? AND test_type = ?
+        """,
+        (user_id, test_type),
+    ).fetchone()
+    return None if row is None else _from_row(row)
+
+
+def _from_row(row):
+    *fields, points = row
+    return Trend(*fields, tuple(tuple(point) for point in json.loads(points)))
+
+
+def _save(conn, user_id, test_type, trend):
+    if trend is None:
+        return
+    conn.execute(
+        """
+        INSERT OR REPLACE INTO trends
+            (user_id, test_type, count, first_at, last_at, last_value, delta,
+             moving_average, week_streak, points)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (user_id, test_type, trend.count, trend.first_at, trend.last_at, trend.last_value,
+         trend.delta, trend.moving_average, trend.week_streak, json.dumps(trend.points)),
+    )
+
+
+def load_trends(path, user_id):
+    """A user's trends by test type."""
+    conn = connect(path)
+    try:
+        rows = conn.execute(
+            """
+            SELECT test_type, count, first_at, last_at, last_value, delta, moving_average,
+                   week_streak, points
+            FROM trends WHERE user_id = ?
+            """,
+            (user_id,),
+        ).fetchall()
+    finally:
+        conn.close()
+    return {row[0]: _from_row(row[1:]) for row in rows}